@@ -1,11 +1,19 @@
 import streamlit as st
 
+from core import http
+
 st.set_page_config(
     page_title="ÆTHERIUM",
     page_icon="🌐",
     layout="wide"
 )
 
+# Wake the cold-starting backend in the background before the first click
+try:
+    http.warmup(st.secrets["BACKEND_URL"])
+except (FileNotFoundError, KeyError):
+    pass
+
 st.title("🌐 ÆTHERIUM")
 st.markdown("### All-in-one intelligence for modern applications.")
 
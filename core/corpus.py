@@ -0,0 +1,248 @@
+"""Batch corpus analysis for TextVortex.
+
+Documents are read from CSV or JSONL in chunks, grouped into batches and
+sent to the backend with a bounded number of concurrent requests (an
+asyncio loop dispatching onto the shared pooled session). Operations
+with a ``<endpoint>/batch`` route get one request per batch; the rest get
+one per document. Results are written incrementally to JSONL or Parquet,
+one row per document with a JSON column per operation.
+"""
+
+import asyncio
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+import pandas as pd
+
+from core import http
+from core.datasets import read_bytes
+
+BATCH_SIZE = 32
+DEFAULT_CONCURRENCY = 8
+CHUNK_ROWS = 5_000
+
+# Backend answers meaning "no batch route for this operation"
+UNSUPPORTED = {404, 405, 501}
+
+_no_batch = set()   # (base_url, endpoint) pairs without a batch route
+_lock = threading.Lock()
+
+
+def column_name(endpoint):
+    return endpoint.rstrip("/").rsplit("/", 1)[-1]
+
+
+# ---------------- INPUT ---------------- #
+def _is_jsonl(filename):
+    return Path(filename).suffix.lower() in (".jsonl", ".ndjson", ".json")
+
+
+def _reader(file, filename, chunk_rows, nrows=None):
+    # pandas closes the buffer it reads from, so give it a fresh view
+    file = io.BytesIO(read_bytes(file))
+    if _is_jsonl(filename):
+        return pd.read_json(file, lines=True, chunksize=chunk_rows, nrows=nrows)
+    return pd.read_csv(file, chunksize=chunk_rows, nrows=nrows)
+
+
+def preview(file, filename, rows=5):
+    """First few rows, for picking the text and id columns."""
+    return next(iter(_reader(file, filename, rows, nrows=rows)))
+
+
+def read_documents(file, filename, text_column, id_column=None,
+                   chunk_rows=CHUNK_ROWS):
+    """Yield ``(doc_id, text)`` without loading the whole corpus."""
+    offset = 0
+    for chunk in _reader(file, filename, chunk_rows):
+        texts = chunk[text_column].fillna("").astype(str)
+        ids = (
+            chunk[id_column].astype(str) if id_column
+            else map(str, range(offset, offset + len(chunk)))
+        )
+        yield from zip(ids, texts)
+        offset += len(chunk)
+
+
+# ---------------- OUTPUT ---------------- #
+class ResultWriter:
+    """Appends result rows to ``.jsonl`` or ``.parquet`` as they arrive."""
+
+    def __init__(self, path, columns, flush_rows=1_000):
+        self.path = Path(path)
+        self.columns = ["doc_id", *columns, "errors"]
+        self.flush_rows = flush_rows
+        self.rows = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._parquet = self.path.suffix.lower() == ".parquet"
+        self._buffer = []
+
+        if self._parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            self._schema = pa.schema([(c, pa.string()) for c in self.columns])
+            self._writer = pq.ParquetWriter(self.path, self._schema)
+        else:
+            self._writer = open(self.path, "w", encoding="utf-8")
+
+    def write(self, records):
+        for record in records:
+            if self._parquet:
+                self._buffer.append(record)
+            else:
+                self._writer.write(json.dumps(record) + "\n")
+        self.rows += len(records)
+
+        if len(self._buffer) >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        if self._parquet and self._buffer:
+            import pyarrow as pa
+
+            self._writer.write_table(pa.Table.from_pylist(
+                [self._encoded(r) for r in self._buffer], schema=self._schema
+            ))
+            self._buffer = []
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+    def _encoded(self, record):
+        # Nested results are stored as JSON strings in Parquet
+        return {
+            c: v if v is None or isinstance(v, str) else json.dumps(v)
+            for c, v in ((c, record.get(c)) for c in self.columns)
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------------- DISPATCH ---------------- #
+def _call(base_url, endpoint, payload, headers):
+    response = http.post(base_url, endpoint, json=payload, headers=headers)
+    return response.status_code, response
+
+
+def _batch_supported(base_url, endpoint):
+    with _lock:
+        return (base_url, endpoint) not in _no_batch
+
+
+async def _run_endpoint(loop, executor, base_url, endpoint, batch, headers):
+    """Results for one operation over a batch: ``[(result, error), ...]``."""
+    if _batch_supported(base_url, endpoint):
+        status, response = await loop.run_in_executor(
+            executor, _call, base_url, f"{endpoint}/batch",
+            {"texts": [text for _, text in batch]}, headers
+        )
+        if status == 200:
+            return [(r, None) for r in response.json()["results"]]
+        if status in UNSUPPORTED:
+            with _lock:
+                _no_batch.add((base_url, endpoint))
+        else:
+            return [(None, f"{status}: {response.text[:200]}")] * len(batch)
+
+    async def single(text):
+        try:
+            status, response = await loop.run_in_executor(
+                executor, _call, base_url, endpoint, {"text": text}, headers
+            )
+        except Exception as e:
+            return None, str(e)
+        if status != 200:
+            return None, f"{status}: {response.text[:200]}"
+        return response.json(), None
+
+    return await asyncio.gather(*(single(text) for _, text in batch))
+
+
+async def _run_batch(loop, executor, base_url, endpoints, batch, headers):
+    per_endpoint = await asyncio.gather(*(
+        _run_endpoint(loop, executor, base_url, endpoint, batch, headers)
+        for endpoint in endpoints
+    ), return_exceptions=True)
+
+    records = []
+    for i, (doc_id, _) in enumerate(batch):
+        record = {"doc_id": doc_id}
+        errors = {}
+        for endpoint, results in zip(endpoints, per_endpoint):
+            name = column_name(endpoint)
+            result, error = (
+                (None, str(results)) if isinstance(results, Exception)
+                else results[i]
+            )
+            record[name] = result
+            if error is not None:
+                errors[name] = error
+        record["errors"] = errors or None
+        records.append(record)
+    return records
+
+
+async def _stream(loop, executor, base_url, endpoints, documents, headers,
+                  concurrency, batch_size):
+    documents = iter(documents)
+    pending = set()
+
+    try:
+        while True:
+            # Keep a few batches queued per connection, never the whole corpus
+            while len(pending) < 2 * concurrency:
+                batch = list(islice(documents, batch_size))
+                if not batch:
+                    break
+                pending.add(asyncio.ensure_future(_run_batch(
+                    loop, executor, base_url, endpoints, batch, headers
+                )))
+
+            if not pending:
+                return
+
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def analyze_corpus(base_url, endpoints, documents, headers=None,
+                   concurrency=DEFAULT_CONCURRENCY, batch_size=BATCH_SIZE):
+    """Run ``endpoints`` over ``(doc_id, text)`` pairs.
+
+    At most ``concurrency`` requests are in flight at once. Yields a list
+    of per-document records as each batch completes (not in input order).
+    """
+    loop = asyncio.new_event_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    stream = _stream(
+        loop, executor, base_url, endpoints, documents, headers,
+        concurrency, batch_size
+    )
+
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(stream.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(stream.aclose())
+        executor.shutdown(wait=False, cancel_futures=True)
+        loop.close()
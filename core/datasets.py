@@ -0,0 +1,155 @@
+"""Content-addressed dataset store shared by every Streamlit page.
+
+Uploaded CSVs are keyed by a hash of their bytes, parsed once (with the
+pyarrow engine when available) and kept in a memory-bounded LRU. Frames
+evicted from memory spill to local Parquet, so a later lookup is a fast
+columnar read instead of a CSV re-parse. Returned frames are shared
+between reruns and pages: treat them as read-only.
+"""
+
+import hashlib
+import io
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+from core.profiler import profile as profile_frame
+
+MEMORY_LIMIT = 1024 * 1024 * 1024    # bytes of DataFrames kept in memory
+SPILL_DIR = Path(tempfile.gettempdir()) / "aetherium" / "datasets"
+
+
+def content_key(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def read_bytes(file):
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    file.seek(0)
+    return file.read()
+
+
+def parse_csv(data):
+    try:
+        return pd.read_csv(io.BytesIO(data), engine="pyarrow")
+    except (ImportError, ValueError):
+        # pyarrow missing, or an input the pyarrow engine can't handle
+        return pd.read_csv(io.BytesIO(data))
+
+
+class DatasetStore:
+    def __init__(self, memory_limit=MEMORY_LIMIT, spill_dir=SPILL_DIR):
+        self.memory_limit = memory_limit
+        self.spill_dir = Path(spill_dir)
+
+        self._frames = OrderedDict()    # key -> (df, nbytes)
+        self._upload_keys = {}          # uploader file_id -> key
+        self._profiles = {}             # key -> column profile
+        self._memory = 0
+        self._lock = threading.RLock()
+
+    def key_for(self, file):
+        """Content key of an uploaded or opened file, hashed once per upload."""
+        file_id = getattr(file, "file_id", None)
+
+        with self._lock:
+            if file_id and file_id in self._upload_keys:
+                return self._upload_keys[file_id]
+
+        key = content_key(read_bytes(file))
+
+        with self._lock:
+            if file_id:
+                self._upload_keys[file_id] = key
+        return key
+
+    def load_csv(self, file):
+        """Return ``(key, df)`` for an uploaded or opened CSV file."""
+        key = self.key_for(file)
+        df = self.get(key)
+
+        if df is None:
+            df = parse_csv(read_bytes(file))
+            self.put(key, df)
+        return key, df
+
+    def get(self, key):
+        with self._lock:
+            if key in self._frames:
+                self._frames.move_to_end(key)
+                return self._frames[key][0]
+
+            path = self._spill_path(key)
+            if not path.exists():
+                return None
+
+        df = pd.read_parquet(path)
+        self.put(key, df)
+        return df
+
+    def profile(self, key):
+        """Column profile of a stored dataset, computed once per key."""
+        with self._lock:
+            if key in self._profiles:
+                return self._profiles[key]
+
+        df = self.get(key)
+        if df is None:
+            raise KeyError(key)
+
+        result = profile_frame(df)
+        with self._lock:
+            self._profiles[key] = result
+        return result
+
+    def put(self, key, df):
+        nbytes = int(df.memory_usage(deep=True).sum())
+
+        with self._lock:
+            if key in self._frames:
+                self._memory -= self._frames.pop(key)[1]
+            self._frames[key] = (df, nbytes)
+            self._memory += nbytes
+            self._evict()
+
+    def _evict(self):
+        # Always keep the most recent frame, even if it alone is over the limit
+        while self._memory > self.memory_limit and len(self._frames) > 1:
+            key, (df, nbytes) = self._frames.popitem(last=False)
+            self._memory -= nbytes
+            self._spill(key, df)
+
+    def _spill(self, key, df):
+        path = self._spill_path(key)
+        if path.exists():
+            return
+        try:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            df.to_parquet(tmp)
+            tmp.replace(path)
+        except Exception:
+            # No parquet engine or unsupported dtypes: re-parse next time
+            pass
+
+    def _spill_path(self, key):
+        return self.spill_dir / f"{key}.parquet"
+
+
+store = DatasetStore()
+
+
+def key_for(file):
+    return store.key_for(file)
+
+
+def load_csv(file):
+    return store.load_csv(file)
+
+
+def profile(key):
+    return store.profile(key)
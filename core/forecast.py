@@ -0,0 +1,53 @@
+"""Vectorized trend forecasting for AlphaFlux.
+
+Prices are a 2-D ``(n_symbols, n_days)`` matrix and every row gets its own
+least-squares line in one closed-form solve, so forecasting a watchlist
+costs a couple of matrix-vector products instead of one model fit per
+symbol.
+"""
+
+import numpy as np
+
+RECENT_DAYS = 10
+
+
+def fit_trends(prices):
+    """Least-squares ``price = intercept + slope * t`` for every row."""
+    prices = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+    n_days = prices.shape[1]
+
+    t = np.arange(n_days, dtype=np.float64)
+    t_mean = t.mean()
+    t_centered = t - t_mean
+
+    # slope = cov(t, y) / var(t); centering t makes the y mean drop out
+    slopes = prices @ t_centered / np.dot(t_centered, t_centered)
+    intercepts = prices.mean(axis=1) - slopes * t_mean
+    return slopes, intercepts
+
+
+def trend_forecast(prices, horizon):
+    """Extend each row's trend ``horizon`` steps past its last observation.
+
+    Returns ``(forecast, slopes)`` with ``forecast`` shaped
+    ``(n_symbols, horizon)``.
+    """
+    prices = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+    slopes, intercepts = fit_trends(prices)
+
+    future_t = np.arange(prices.shape[1], prices.shape[1] + horizon)
+    forecast = intercepts[:, None] + slopes[:, None] * future_t
+    return forecast, slopes
+
+
+def trend_signals(prices, forecast, recent_days=RECENT_DAYS):
+    """BUY/SELL and confidence per row, from recent vs forecast averages."""
+    prices = np.atleast_2d(prices)
+    forecast = np.atleast_2d(forecast)
+
+    recent_avg = prices[:, -recent_days:].mean(axis=1)
+    future_avg = forecast.mean(axis=1)
+
+    buy = future_avg > recent_avg
+    confidence = np.abs(future_avg - recent_avg) / np.maximum(recent_avg, 1)
+    return buy, confidence, recent_avg, future_avg
@@ -0,0 +1,198 @@
+"""Upload-once dataset handles for repeated backend operations.
+
+A dataset is uploaded to ``POST /datasets`` once per backend, keyed by its
+content hash, and later operations send the returned ``dataset_id``
+instead of the whole file. Backends without that endpoint, or that have
+forgotten a handle, transparently get the file uploaded as before.
+
+Handle support is probed with a small ``POST /datasets`` carrying only
+the content hash, never the file, and each backend's answer is cached.
+A 404 to an operation sent by handle is ambiguous (unknown handle, or
+an endpoint that is missing altogether), so the handle is checked with
+``GET /datasets/<id>`` before it is treated as stale and re-uploaded.
+"""
+
+import threading
+
+from core import http
+from core.uploads import post_file, resumable_upload
+
+UPLOAD_ENDPOINT = "/datasets"
+
+# Answers to the /datasets probe meaning "no handle support here"
+UNSUPPORTED = {404, 405, 501}
+# Operation answers meaning "unknown handle" (404 only once confirmed)
+STALE = {404, 410}
+# Operation doesn't accept handles: send the file instead
+REJECTED = {415, 422}
+
+
+class DatasetHandles:
+    def __init__(self):
+        self._handles = {}          # (base_url, key) -> dataset_id
+        self._unsupported = set()   # base URLs without handle support
+        self._no_resumable = set()  # base URLs without the /uploads API
+        self._lock = threading.Lock()
+
+    def supported(self, base_url):
+        with self._lock:
+            return base_url not in self._unsupported
+
+    def _mark_unsupported(self, base_url):
+        with self._lock:
+            self._unsupported.add(base_url)
+
+    def _probe(self, base_url, key, headers):
+        """Ask for ``key`` by hash alone: a handle, False (no support) or None."""
+        response = http.post(
+            base_url, UPLOAD_ENDPOINT, data={"content_hash": key},
+            headers=headers, cache=False
+        )
+        if response.status_code in UNSUPPORTED:
+            return False
+        if response.ok:
+            # The backend already holds this content
+            return _dataset_id(response)
+        return None
+
+    def upload(self, base_url, key, file, headers=None, progress=None):
+        """Return the backend handle for ``file``, uploading it if needed.
+
+        Prefers a resumable chunked upload and falls back to a single
+        streamed multipart POST to ``/datasets``.
+        """
+        with self._lock:
+            if (base_url, key) in self._handles:
+                return self._handles[(base_url, key)]
+            if base_url in self._unsupported:
+                return None
+            resumable = base_url not in self._no_resumable
+
+        handle = self._probe(base_url, key, headers)
+        if handle is False:
+            self._mark_unsupported(base_url)
+            return None
+
+        filename, _, content_type = _file_info(file)
+
+        result = None
+        if handle is None and resumable:
+            result = resumable_upload(
+                base_url, file, filename, content_type,
+                headers=headers, progress=progress
+            )
+            if result is None:
+                with self._lock:
+                    self._no_resumable.add(base_url)
+            else:
+                handle = result.get("dataset_id")
+
+        if handle is None and result is None:
+            response = post_file(
+                base_url,
+                UPLOAD_ENDPOINT,
+                file,
+                filename,
+                content_type,
+                data={"content_hash": key},
+                headers=headers,
+                progress=progress
+            )
+
+            if response.status_code in UNSUPPORTED:
+                self._mark_unsupported(base_url)
+                return None
+
+            response.raise_for_status()
+            handle = _dataset_id(response)
+
+        with self._lock:
+            if handle is None:
+                self._unsupported.add(base_url)
+                return None
+            self._handles[(base_url, key)] = handle
+        return handle
+
+    def known(self, base_url, handle, headers=None):
+        """Whether the backend confirms it still holds ``handle``."""
+        response = http.get(
+            base_url, f"{UPLOAD_ENDPOINT}/{handle}", headers=headers
+        )
+        return response.ok
+
+    def forget(self, base_url, key):
+        with self._lock:
+            self._handles.pop((base_url, key), None)
+
+    def post(self, base_url, endpoint, file, key, data=None, headers=None,
+             progress=None):
+        """POST a dataset operation, by handle when possible.
+
+        Returns the backend response, so callers keep their existing
+        status-code handling. ``progress(done, total)`` reports upload
+        progress whenever the file itself has to be sent.
+        """
+        data = dict(data or {})
+
+        for _ in range(2):
+            handle = self.upload(
+                base_url, key, file, headers=headers, progress=progress
+            )
+            if handle is None:
+                break
+
+            response = http.post(
+                base_url,
+                endpoint,
+                data={**data, "dataset_id": handle},
+                headers=headers
+            )
+            if response.status_code in REJECTED:
+                break
+            if response.status_code not in STALE:
+                return response
+            if response.status_code == 404 and self.known(base_url, handle, headers):
+                # The handle is fine; the 404 is the operation's own
+                break
+
+            # Expired handle: re-upload once, then fall back to the file
+            self.forget(base_url, key)
+
+        filename, _, content_type = _file_info(file)
+        return post_file(
+            base_url,
+            endpoint,
+            file,
+            filename,
+            content_type,
+            data=data,
+            headers=headers,
+            progress=progress,
+            file_key=key
+        )
+
+
+def _dataset_id(response):
+    try:
+        return response.json().get("dataset_id")
+    except ValueError:
+        return None
+
+
+def _file_info(file):
+    return (
+        getattr(file, "name", "dataset.csv"),
+        file,
+        getattr(file, "type", None) or "text/csv"
+    )
+
+
+handles = DatasetHandles()
+
+
+def post_dataset(base_url, endpoint, file, key, data=None, headers=None,
+                 progress=None):
+    return handles.post(
+        base_url, endpoint, file, key,
+        data=data, headers=headers, progress=progress
+    )
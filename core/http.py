@@ -0,0 +1,355 @@
+"""Shared pooled HTTP client for the Streamlit pages and the desktop app.
+
+Every caller goes through one process-wide ``requests.Session`` per base URL,
+so repeated clicks reuse warm keep-alive connections instead of paying a new
+TCP + TLS handshake against the backend each time.
+
+Responses from deterministic endpoints are also shared process-wide: a
+TTL + size-bounded LRU keyed by endpoint and a hash of the payload, with
+single-flight coalescing so concurrent identical requests (from any
+session) wait on one in-flight call. Callers get an ordinary
+``requests.Response`` either way.
+
+Every call also goes through the tail-latency controls in
+``core.resilience``: a per-backend circuit breaker, and for idempotent
+calls jittered-backoff retries plus hedging past the endpoint's p95.
+``warmup`` pings a cold backend in the background.
+"""
+
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from core import resilience
+
+# ---------------- POOL SETTINGS ---------------- #
+POOL_CONNECTIONS = 4       # distinct hosts kept in the pool
+POOL_MAXSIZE = 16          # concurrent keep-alive connections per host
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 60)
+
+ENDPOINT_TIMEOUTS = {
+    "/inferno/generate": (5, 30),
+    "/inferno/trim": (5, 120),
+    "/inferno/classify": (5, 180),
+    "/inferno/regress": (5, 180),
+    "/inferno/cluster": (5, 180),
+    "/inferno/associate": (5, 180),
+    "/modelcraft/benchmark": (5, 300),
+    "/text/keywords": (5, 30),
+    "/text/sentiment": (5, 30),
+}
+
+# ---------------- RESPONSE CACHE SETTINGS ---------------- #
+CACHE_TTL = 300                      # seconds a cached response stays fresh
+CACHE_BYTES = 64 * 1024 * 1024       # total body bytes kept
+
+# Endpoints whose answer depends only on the request (never uploads,
+# upload sessions or random generators)
+CACHEABLE = (
+    "/text/",
+    "/inferno/trim",
+    "/inferno/classify",
+    "/inferno/regress",
+    "/inferno/cluster",
+    "/inferno/associate",
+    "/modelcraft/benchmark",
+    "/vision/"
+)
+
+# ---------------- HEDGING ---------------- #
+# Only calls cheap enough to run twice are hedged; the ML endpoints would
+# double the load on a backend that is already slow
+HEDGEABLE = ("/text/",)
+
+# Headers that describe the body itself (a multipart boundary is random)
+BODY_HEADERS = {"content-type", "content-encoding", "content-length"}
+
+# ---------------- WARMUP ---------------- #
+WARMUP_ENDPOINT = "/"
+WARMUP_TIMEOUT = (10, 90)      # long enough for a cold start
+
+_sessions = {}
+_breakers = {}
+_warmed = set()
+_lock = threading.Lock()
+latencies = resilience.LatencyTracker()
+
+
+def get_session(base_url):
+    """Return the shared keep-alive session for ``base_url``."""
+    with _lock:
+        session = _sessions.get(base_url)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=POOL_CONNECTIONS,
+                pool_maxsize=POOL_MAXSIZE,
+                pool_block=True
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[base_url] = session
+        return session
+
+
+def breaker_for(base_url):
+    with _lock:
+        if base_url not in _breakers:
+            _breakers[base_url] = resilience.CircuitBreaker()
+        return _breakers[base_url]
+
+
+def warmup(base_url, endpoint=WARMUP_ENDPOINT):
+    """Ping ``base_url`` once per process in the background.
+
+    Any answer (even a 404) means the instance is up and a keep-alive
+    connection is now in the pool, so the first real call doesn't pay
+    for the cold start.
+    """
+    with _lock:
+        if base_url in _warmed:
+            return
+        _warmed.add(base_url)
+
+    def ping():
+        try:
+            get_session(base_url).get(f"{base_url}{endpoint}", timeout=WARMUP_TIMEOUT)
+        except requests.exceptions.RequestException:
+            pass
+
+    threading.Thread(target=ping, name="backend-warmup", daemon=True).start()
+
+
+def hedgeable(method, endpoint):
+    return method == "GET" or endpoint.startswith(HEDGEABLE)
+
+
+def timeout_for(endpoint):
+    """Per-endpoint ``(connect, read)`` timeout, falling back to the default."""
+    if endpoint in ENDPOINT_TIMEOUTS:
+        return ENDPOINT_TIMEOUTS[endpoint]
+    if endpoint.startswith("/text/"):
+        return (5, 30)
+    if endpoint.startswith("/vision/"):
+        return (5, 90)
+    return DEFAULT_TIMEOUT
+
+
+# ---------------- RESPONSE CACHE ---------------- #
+def _canonical(value):
+    """JSON-able form of a request part; TypeError for streams and files."""
+    if isinstance(value, bytes):
+        return hashlib.blake2b(value, digest_size=16).hexdigest()
+    if isinstance(value, (str, int, float, bool, type(None))):
+        return value
+    if isinstance(value, Mapping):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    # Generators, streams and open files can only be read once: never cached
+    raise TypeError(type(value).__name__)
+
+
+def cache_key(method, base_url, endpoint, kwargs, body_key=None):
+    """Key for a cacheable request, or None.
+
+    A streamed body can't be hashed; ``body_key`` (any JSON-able value,
+    e.g. a dataset's content hash plus its form fields) stands in for it,
+    and the headers describing the body are left out.
+    """
+    if method != "POST" or kwargs.get("stream") or not endpoint.startswith(CACHEABLE):
+        return None
+
+    names = ("json", "data", "files", "params", "headers")
+    if body_key is not None:
+        names = ("json", "params")
+
+    try:
+        parts = {name: _canonical(kwargs.get(name)) for name in names}
+        if body_key is not None:
+            parts["body"] = _canonical(body_key)
+            parts["headers"] = _canonical({
+                k: v for k, v in (kwargs.get("headers") or {}).items()
+                if k.lower() not in BODY_HEADERS
+            })
+    except TypeError:
+        return None
+
+    blob = json.dumps([method, base_url, endpoint, parts], sort_keys=True)
+    return hashlib.blake2b(blob.encode(), digest_size=16).hexdigest()
+
+
+def _copy(response):
+    clone = requests.Response()
+    clone.status_code = response.status_code
+    clone.headers = copy.copy(response.headers)
+    clone._content = response.content
+    clone.encoding = response.encoding
+    clone.reason = response.reason
+    clone.url = response.url
+    clone.request = response.request
+    clone.elapsed = response.elapsed
+    return clone
+
+
+class ResponseCache:
+    """TTL + byte-bounded LRU of successful responses, with single-flight."""
+
+    def __init__(self, ttl=CACHE_TTL, max_bytes=CACHE_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()    # key -> (expires, response, nbytes)
+        self._inflight = {}              # key -> (event, [response or error])
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, key, send):
+        """Cached response for ``key``, calling ``send()`` at most once."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                return _copy(entry[1])
+            if entry:
+                self._drop(key)
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = (threading.Event(), [])
+
+        event, outcome = flight
+        if not leader:
+            # Someone is already asking the same thing: wait for their answer
+            event.wait()
+            if not outcome:
+                # The leader was interrupted (e.g. a Streamlit rerun)
+                # before it got one: ask again
+                return self.fetch(key, send)
+            if isinstance(outcome[0], Exception):
+                raise outcome[0]
+            return _copy(outcome[0])
+
+        try:
+            response = send()
+            outcome.append(response)
+        except Exception as e:
+            outcome.append(e)
+            raise
+        finally:
+            # Settled even on a BaseException, so followers never hang
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+        if response.status_code == 200:
+            self._store(key, response)
+        return _copy(response)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _store(self, key, response):
+        nbytes = len(response.content)
+        if nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, response, nbytes)
+            self._bytes += nbytes
+
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        _, _, nbytes = self._entries.pop(key)
+        self._bytes -= nbytes
+
+
+responses = ResponseCache()
+
+
+# ---------------- REQUESTS ---------------- #
+def request(method, base_url, endpoint, timeout=None, cache=True,
+            retries=True, body_key=None, **kwargs):
+    """Send a request through the pooled session and return the response.
+
+    Deterministic POSTs (see ``CACHEABLE``) with hashable bodies, or a
+    streamed body identified by ``body_key``, are served from, and
+    coalesced through, the shared response cache; pass ``cache=False``
+    to always hit the backend. Calls with hashable bodies (and GETs) are
+    also retried unless ``retries=False``, e.g. when the caller has a
+    faster fallback of its own; a stream can't be replayed. Only
+    ``HEDGEABLE`` calls are hedged.
+    """
+    session = get_session(base_url)
+    breaker = breaker_for(base_url)
+
+    def send():
+        started = time.monotonic()
+        response = session.request(
+            method,
+            f"{base_url}{endpoint}",
+            timeout=timeout or timeout_for(endpoint),
+            **kwargs
+        )
+        if response.ok:
+            latencies.record(endpoint, time.monotonic() - started)
+        return response
+
+    # Replayable, deterministic calls can be retried and hedged safely
+    key = cache_key(method, base_url, endpoint, kwargs, body_key)
+    idempotent = (key is not None and body_key is None) or method == "GET"
+
+    def resilient():
+        admitted = breaker.allow()
+        if not admitted:
+            raise resilience.CircuitOpenError(
+                f"{base_url} is failing; not retrying for a few seconds"
+            )
+
+        call = send
+        if idempotent and retries:
+            delay = None
+            if hedgeable(method, endpoint):
+                delay = latencies.quantile(endpoint)
+            attempt = send if delay is None else lambda: resilience.hedged(send, delay)
+            call = lambda: resilience.with_retries(attempt)
+
+        # Only an unreachable or failing backend counts against it, and
+        # whatever happens a half-open probe is always settled
+        ok = None
+        try:
+            response = call()
+            ok = response.status_code not in resilience.DOWN_STATUSES
+            return response
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            ok = False
+            raise
+        finally:
+            breaker.record(ok, probe=admitted == resilience.PROBE)
+
+    if not cache or key is None:
+        return resilient()
+    return responses.fetch(key, resilient)
+
+
+def post(base_url, endpoint, **kwargs):
+    return request("POST", base_url, endpoint, **kwargs)
+
+
+def get(base_url, endpoint, **kwargs):
+    return request("GET", base_url, endpoint, **kwargs)
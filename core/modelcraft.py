@@ -0,0 +1,323 @@
+"""Local benchmarking helpers for ModelCraft-X."""
+
+import math
+import os
+import time
+from multiprocessing.connection import wait
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import (
+    ParameterGrid, RepeatedKFold, RepeatedStratifiedKFold, train_test_split
+)
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from core import workers
+from core.profiler import profile
+
+
+# Search spaces for the optional successive-halving tuning mode
+PARAM_GRIDS = {
+    "Logistic Regression": {
+        "C": [0.01, 0.1, 1.0, 10.0, 100.0]
+    },
+    "Random Forest": {
+        "n_estimators": [50, 100, 200],
+        "max_depth": [None, 8, 16],
+        "min_samples_leaf": [1, 5]
+    },
+    "SVM": {
+        "C": [0.1, 1.0, 10.0],
+        "gamma": ["scale", 0.01, 0.1]
+    },
+    "Linear Regression": {
+        "fit_intercept": [True, False]
+    },
+    "Random Forest Regressor": {
+        "n_estimators": [50, 100, 200],
+        "max_depth": [None, 8, 16],
+        "min_samples_leaf": [1, 5]
+    },
+    "SVR": {
+        "C": [0.1, 1.0, 10.0],
+        "epsilon": [0.01, 0.1, 1.0]
+    }
+}
+
+
+def default_workers():
+    return max(1, os.cpu_count() or 1)
+
+
+def prepare_xy(df, target, columns=None):
+    """Split off the target, label-encode text columns and detect the task.
+
+    ``columns`` is the dataset's :func:`core.profiler.profile`; it is
+    computed here when the caller has no cached one.
+    """
+    if columns is None:
+        columns = profile(df)
+    categorical = columns["kind"] == "categorical"
+
+    X = df.drop(columns=[target])
+    y = df[target]
+
+    # Encode categorical features
+    for col in columns.index[categorical]:
+        if col != target:
+            X[col] = LabelEncoder().fit_transform(X[col])
+
+    # Detect problem type
+    task_type = (
+        "classification" if columns.at[target, "n_unique"] <= 20
+        else "regression"
+    )
+
+    if task_type == "classification" and categorical[target]:
+        y = LabelEncoder().fit_transform(y)
+
+    return X, np.asarray(y), task_type
+
+
+def build_folds(X, y, task_type, n_splits=5, n_repeats=1, random_state=42):
+    """Split once and scale every fold once, for all models to share.
+
+    ``n_splits=1`` gives the classic 80/20 hold-out split. Returns a list
+    of ``(X_train, X_test, y_train, y_test)`` with scaled feature matrices.
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y)
+
+    if n_splits == 1:
+        splits = [train_test_split(
+            np.arange(len(y)), test_size=0.2, random_state=random_state
+        )]
+    else:
+        splitter = RepeatedKFold(
+            n_splits=n_splits, n_repeats=n_repeats, random_state=random_state
+        )
+        if task_type == "classification":
+            splitter = RepeatedStratifiedKFold(
+                n_splits=n_splits, n_repeats=n_repeats,
+                random_state=random_state
+            )
+        try:
+            splits = list(splitter.split(X, y))
+        except ValueError:
+            # Too few members per class to stratify
+            splits = list(RepeatedKFold(
+                n_splits=n_splits, n_repeats=n_repeats,
+                random_state=random_state
+            ).split(X, y))
+
+    # Shuffle rows within each fold so any prefix is a random subsample
+    rng = np.random.default_rng(random_state)
+
+    folds = []
+    for train_idx, test_idx in splits:
+        train_idx = rng.permutation(train_idx)
+        test_idx = rng.permutation(test_idx)
+        scaler = StandardScaler().fit(X[train_idx])
+        folds.append((
+            scaler.transform(X[train_idx]),
+            scaler.transform(X[test_idx]),
+            y[train_idx],
+            y[test_idx]
+        ))
+    return folds
+
+
+def _score_model(model, folds, scorer):
+    """Fit a fresh clone of ``model`` on each fold and return the scores."""
+    scores = []
+    for X_train, X_test, y_train, y_test in folds:
+        fitted = clone(model).fit(X_train, y_train)
+        scores.append(float(scorer(y_test, fitted.predict(X_test))))
+    return scores
+
+
+def _subsample(folds, n_rows):
+    """The first ``n_rows`` training and test rows of every fold.
+
+    The folds are already shuffled, so this is a random subsample; the
+    slices are views, so nothing is copied until they are pickled.
+    """
+    return [
+        (X_train[:n_rows], X_test[:n_rows], y_train[:n_rows], y_test[:n_rows])
+        for X_train, X_test, y_train, y_test in folds
+    ]
+
+
+def _process_main(conn, fn, args):
+    try:
+        conn.send(("ok", fn(*args)))
+    except Exception as e:
+        conn.send(("error", str(e)))
+    finally:
+        conn.close()
+
+
+def _run_processes(jobs, max_workers=None, budget=None, deadline=None):
+    """Run ``fn(*args)`` for each ``(key, fn, args)`` job in its own process.
+
+    Yields ``(key, status, value, seconds)`` as jobs finish, where status
+    is ``"ok"``, ``"error"`` or ``"timed out"``. At most ``max_workers``
+    jobs run at once. A job running longer than ``budget`` seconds is
+    terminated; once the absolute ``deadline`` (``time.perf_counter()``)
+    passes, running jobs are terminated and pending ones never start.
+    """
+    # Never forked: see core.workers
+    ctx = workers.context(__name__)
+    max_workers = max_workers or default_workers()
+
+    pending = list(jobs)
+    running = {}
+
+    try:
+        while pending or running:
+            if deadline is not None and time.perf_counter() >= deadline:
+                pending = []
+
+            while pending and len(running) < max_workers:
+                key, fn, args = pending.pop(0)
+                recv_conn, send_conn = ctx.Pipe(duplex=False)
+
+                proc = ctx.Process(
+                    target=_process_main,
+                    args=(send_conn, fn, args),
+                    daemon=True
+                )
+                with workers.detached_main():
+                    proc.start()
+                send_conn.close()
+                running[recv_conn] = (key, proc, time.perf_counter())
+
+            if not running:
+                break
+
+            limits = [started + budget for _, _, started in running.values()] \
+                if budget is not None else []
+            if deadline is not None:
+                limits.append(deadline)
+
+            timeout = None
+            if limits:
+                timeout = max(0.0, min(limits) - time.perf_counter())
+
+            for conn in wait(list(running), timeout=timeout):
+                key, proc, started = running.pop(conn)
+                try:
+                    status, value = conn.recv()
+                except EOFError:
+                    proc.join()
+                    status, value = "error", f"worker exited ({proc.exitcode})"
+                conn.close()
+                proc.join()
+                yield key, status, value, time.perf_counter() - started
+
+            now = time.perf_counter()
+            expired = deadline is not None and now >= deadline
+            for conn, (key, proc, started) in list(running.items()):
+                if expired or (budget is not None and now - started >= budget):
+                    proc.terminate()
+                    proc.join()
+                    conn.close()
+                    del running[conn]
+                    yield key, "timed out", None, now - started
+    finally:
+        # Abandoned run (e.g. a Streamlit rerun): don't leave fits behind
+        for conn, (_, proc, _) in running.items():
+            proc.terminate()
+            conn.close()
+
+
+def run_zoo(models, folds, scorer, max_workers=None, budget=None):
+    """Score every model in ``models`` concurrently, one process per model.
+
+    Each model is scored on every fold from :func:`build_folds`. Yields a
+    result dict per model (mean and std over folds) as soon as it
+    finishes. At most ``max_workers`` models run at once, and a model
+    running longer than ``budget`` seconds is terminated and reported as
+    timed out.
+    """
+    jobs = [
+        (name, _score_model, (model, folds, scorer))
+        for name, model in models.items()
+    ]
+
+    for name, status, scores, seconds in _run_processes(
+        jobs, max_workers=max_workers, budget=budget
+    ):
+        ok = status == "ok"
+        yield {
+            "model": name,
+            "score": float(np.mean(scores)) if ok else None,
+            "std": float(np.std(scores)) if ok else None,
+            "seconds": seconds,
+            "status": "ok" if ok else (
+                status if scores is None else f"{status}: {scores}"
+            )
+        }
+
+
+def successive_halving(model, param_grid, folds, scorer, factor=3,
+                       min_rows=500, max_workers=None, deadline=None):
+    """Tune ``model`` over ``param_grid`` by successive halving.
+
+    Every candidate is first scored on a small row subsample of each fold;
+    only the best ``1 / factor`` survive each round, and the survivors get
+    ``factor`` times more rows. Candidates within a round are evaluated in
+    parallel. When ``deadline`` (``time.perf_counter()``) passes, the
+    search stops and the best candidate of the last round reached wins.
+    Returns None if the deadline passes before any round finishes.
+    """
+    candidates = list(ParameterGrid(param_grid))
+    n_total = min(len(fold[0]) for fold in folds)
+
+    n_rounds = 1 + math.ceil(math.log(len(candidates), factor)) \
+        if len(candidates) > 1 else 1
+    n_rows = max(min_rows, n_total // factor ** (n_rounds - 1))
+
+    best = None
+    rounds = []
+
+    while candidates:
+        n_rows = min(n_rows, n_total)
+        # Only this round's rows are sent to the workers
+        subsample = _subsample(folds, n_rows)
+        jobs = [
+            (i, _score_model,
+             (clone(model).set_params(**params), subsample, scorer))
+            for i, params in enumerate(candidates)
+        ]
+
+        scored = []
+        for i, status, scores, _ in _run_processes(
+            jobs, max_workers=max_workers, deadline=deadline
+        ):
+            if status == "ok":
+                scored.append((float(np.mean(scores)), i))
+
+        if not scored:
+            break
+
+        scored.sort(reverse=True)
+        top_score, top = scored[0]
+        best = {"params": candidates[top], "score": top_score, "rows": n_rows}
+        rounds.append({
+            "candidates": len(candidates),
+            "rows": n_rows,
+            "best_score": top_score
+        })
+
+        out_of_time = deadline is not None and time.perf_counter() >= deadline
+        if len(candidates) == 1 or n_rows == n_total or out_of_time:
+            break
+
+        keep = max(1, len(candidates) // factor)
+        candidates = [candidates[i] for _, i in scored[:keep]]
+        n_rows *= factor
+
+    if best is not None:
+        best["rounds"] = rounds
+    return best
@@ -0,0 +1,226 @@
+"""Local NLP engine for the TextVortex operations.
+
+Every ``/text/*`` operation can run in-process from one shared analysis of
+the text: it is tokenized once, and lowercased words, stems and lemmas are
+derived from that single pass (stems and lemmas once per distinct word).
+Stopword sets, the stemmer and the lemmatizer are loaded once per process.
+N-grams are counted over an array of token ids in one vectorized pass,
+and readability scores use the standard formulas over the same words
+with a vowel-group syllable estimate.
+"""
+
+import re
+import threading
+from collections import Counter
+from functools import cached_property
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"\w+(?:['’]\w+)*|[^\w\s]")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=\S)")
+VOWEL_GROUP_RE = re.compile(r"[aeiouy]+")
+
+KEYWORD_LIMIT = 50
+NGRAM_SIZES = (2, 3)
+NGRAM_LIMIT = 20
+
+_resources = {}
+_lock = threading.Lock()
+
+
+# ---------------- SHARED RESOURCES ---------------- #
+def _load(name, loader):
+    with _lock:
+        if name not in _resources:
+            _resources[name] = loader()
+        return _resources[name]
+
+
+def stopwords():
+    """English stopwords (NLTK's list, or scikit-learn's without NLTK data)."""
+    def load():
+        try:
+            from nltk.corpus import stopwords as nltk_stopwords
+            return frozenset(nltk_stopwords.words("english"))
+        except LookupError:
+            from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+            return frozenset(ENGLISH_STOP_WORDS)
+
+    return _load("stopwords", load)
+
+
+def stemmer():
+    def load():
+        from nltk.stem import PorterStemmer
+        return PorterStemmer()
+
+    return _load("stemmer", load)
+
+
+def lemmatizer():
+    """WordNet lemmatizer; raises LookupError without the wordnet data."""
+    def load():
+        import nltk
+        from nltk.stem import WordNetLemmatizer
+
+        try:
+            nltk.data.find("corpora/wordnet")
+        except LookupError:
+            raise LookupError(
+                "Lemmatization needs the NLTK wordnet data "
+                "(python -m nltk.downloader wordnet)"
+            ) from None
+        lemmatizer = WordNetLemmatizer()
+        lemmatizer.lemmatize("warmup")    # loads the corpus lazily otherwise
+        return lemmatizer
+
+    return _load("lemmatizer", load)
+
+
+def syllables(word):
+    """Vowel-group syllable estimate (no pronunciation dictionary needed)."""
+    count = len(VOWEL_GROUP_RE.findall(word))
+    if count > 1 and word.endswith("e") and not word.endswith(("le", "ee")):
+        count -= 1
+    return max(count, 1)
+
+
+# ---------------- ANALYSIS ---------------- #
+class Analysis:
+    """One tokenization pass over ``text``, shared by every operation."""
+
+    def __init__(self, text):
+        self.text = text
+
+    @cached_property
+    def tokens(self):
+        return TOKEN_RE.findall(self.text)
+
+    @cached_property
+    def words(self):
+        """Lowercased alphanumeric tokens."""
+        return [t.lower() for t in self.tokens if t[0].isalnum()]
+
+    @cached_property
+    def content_words(self):
+        stop = stopwords()
+        return [w for w in self.words if w not in stop]
+
+    @cached_property
+    def sentences(self):
+        text = self.text.strip()
+        return SENTENCE_RE.split(text) if text else []
+
+    @cached_property
+    def vocabulary(self):
+        """Distinct words and each word's index into that list."""
+        vocab, ids = np.unique(np.array(self.words, dtype=object), return_inverse=True)
+        return list(vocab), ids
+
+    def _per_word(self, fn):
+        # Apply ``fn`` once per distinct word, then map back to positions
+        vocab, ids = self.vocabulary
+        mapped = np.array([fn(w) for w in vocab], dtype=object)
+        return mapped[ids].tolist() if len(ids) else []
+
+    # ---------------- OPERATIONS ---------------- #
+    def tokenize(self):
+        return {"tokens": self.tokens, "count": len(self.tokens)}
+
+    def remove_stopwords(self):
+        return {
+            "filtered_tokens": self.content_words,
+            "removed": len(self.words) - len(self.content_words)
+        }
+
+    def stem(self):
+        return {"stems": self._per_word(stemmer().stem)}
+
+    def lemmatize(self):
+        return {"lemmas": self._per_word(lemmatizer().lemmatize)}
+
+    def ngrams(self, sizes=NGRAM_SIZES, limit=NGRAM_LIMIT):
+        """Most frequent n-grams, counted over token ids in one pass per n."""
+        vocab, ids = self.vocabulary
+        result = {}
+
+        for n in sizes:
+            if len(ids) < n:
+                result[f"{n}-grams"] = []
+                continue
+
+            windows = np.lib.stride_tricks.sliding_window_view(ids, n)
+            grams, counts = np.unique(windows, axis=0, return_counts=True)
+            top = np.argsort(-counts, kind="stable")[:limit]
+            result[f"{n}-grams"] = [
+                {"ngram": " ".join(vocab[i] for i in grams[j]), "count": int(counts[j])}
+                for j in top
+            ]
+        return result
+
+    def keywords(self, limit=KEYWORD_LIMIT):
+        counts = Counter(w for w in self.content_words if not w.isdigit() and len(w) > 2)
+        return {"keywords": dict(counts.most_common(limit))}
+
+    def stats(self):
+        words = self.words
+        return {
+            "characters": len(self.text),
+            "words": len(words),
+            "unique_words": len(set(words)),
+            "sentences": len(self.sentences),
+            "avg_word_length": round(sum(map(len, words)) / len(words), 2) if words else 0.0,
+            "avg_sentence_length": round(len(words) / len(self.sentences), 2) if self.sentences else 0.0,
+            "lexical_diversity": round(len(set(words)) / len(words), 3) if words else 0.0
+        }
+
+    def complexity(self):
+        words = [w for w in self.words if w.isalpha()]
+        if not words:
+            return {"flesch_reading_ease": 0.0, "flesch_kincaid_grade": 0.0,
+                    "gunning_fog": 0.0, "smog_index": 0.0,
+                    "coleman_liau_index": 0.0, "polysyllabic_words": 0}
+
+        vocab, ids = self.vocabulary
+        counts = np.array([syllables(w) for w in vocab])[ids]
+        alpha = np.array([w.isalpha() for w in self.words])
+        counts = counts[alpha]
+
+        n_words = len(words)
+        n_sentences = max(len(self.sentences), 1)
+        polysyllabic = int((counts >= 3).sum())
+        letters = sum(map(len, words))
+
+        words_per_sentence = n_words / n_sentences
+        syllables_per_word = float(counts.sum()) / n_words
+
+        return {
+            "flesch_reading_ease": round(206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word, 2),
+            "flesch_kincaid_grade": round(0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59, 2),
+            "gunning_fog": round(0.4 * (words_per_sentence + 100 * polysyllabic / n_words), 2),
+            "smog_index": round(1.043 * (polysyllabic * 30 / n_sentences) ** 0.5 + 3.1291, 2),
+            "coleman_liau_index": round(
+                0.0588 * letters / n_words * 100 - 0.296 * n_sentences / n_words * 100 - 15.8, 2
+            ),
+            "polysyllabic_words": polysyllabic
+        }
+
+
+OPERATIONS = {
+    "/text/tokenize": Analysis.tokenize,
+    "/text/stopwords": Analysis.remove_stopwords,
+    "/text/stem": Analysis.stem,
+    "/text/lemmatize": Analysis.lemmatize,
+    "/text/ngrams": Analysis.ngrams,
+    "/text/keywords": Analysis.keywords,
+    "/text/stats": Analysis.stats,
+    "/text/complexity": Analysis.complexity
+}
+
+
+def run_local(endpoint, text, analysis=None):
+    """Local equivalent of a ``/text/*`` endpoint.
+
+    Pass the same ``analysis`` to several calls to share its tokenization.
+    """
+    return OPERATIONS[endpoint](analysis or Analysis(text))
@@ -0,0 +1,180 @@
+"""Screen-resolution plotting for long series and large prediction sets.
+
+Series are reduced to roughly one point per horizontal pixel before they
+reach the browser: LTTB (largest-triangle-three-buckets) keeps the visual
+shape of smooth lines, min/max bucketing keeps every spike. Charts are
+re-sampled for whatever range is visible, and predicted-vs-actual plots
+switch from a scatter to a density heatmap once there are too many
+points to draw individually.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+SCREEN_POINTS = 1500       # about one point per pixel of a wide chart
+SCATTER_LIMIT = 20_000     # above this, pred-vs-actual becomes a heatmap
+
+
+def lttb(x, y, n_out):
+    """Indices of the points kept by largest-triangle-three-buckets."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[edges[i + 1]:edges[i + 2]].mean()
+            next_y = y[edges[i + 1]:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        area = np.abs(
+            (x[a] - next_x) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (next_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+
+    return keep
+
+
+def minmax(y, n_out):
+    """Indices of the endpoints and each bucket's min and max, in order.
+
+    Keeps every spike: the interior is split into equal buckets (the last
+    one padded), so no point falls outside a bucket.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    interior = y[1:-1]
+    size = -(-len(interior) // ((n_out - 2) // 2))      # ceiling division
+    n_buckets = -(-len(interior) // size)
+    pad = n_buckets * size - len(interior)
+
+    lows = np.concatenate([interior, np.full(pad, np.inf)]).reshape(n_buckets, size)
+    highs = np.concatenate([interior, np.full(pad, -np.inf)]).reshape(n_buckets, size)
+    offsets = 1 + np.arange(n_buckets) * size
+    keep = np.concatenate([
+        [0],
+        offsets + np.argmin(lows, axis=1),
+        offsets + np.argmax(highs, axis=1),
+        [n - 1]
+    ])
+    return np.unique(keep)
+
+
+def downsample(series, n_out=SCREEN_POINTS, method="lttb"):
+    """Downsample a Series (numeric or datetime index) for display."""
+    series = series.dropna()
+    if len(series) <= n_out:
+        return series
+
+    if method == "minmax":
+        keep = minmax(series.to_numpy(), n_out)
+    else:
+        index = series.index
+        if isinstance(index, pd.DatetimeIndex):
+            x = index.asi8.astype(np.float64)
+        else:
+            x = np.asarray(index, dtype=np.float64)
+        keep = lttb(x, series.to_numpy(), n_out)
+
+    return series.iloc[keep]
+
+
+def line_figure(series, x_range=None, n_out=SCREEN_POINTS, method="lttb",
+                title=None):
+    """Plotly line chart of ``{name: Series}``, resampled for ``x_range``.
+
+    Only the visible ``(start, end)`` range is sent, at screen resolution,
+    so zooming into a long series shows full detail again.
+    """
+    fig = go.Figure()
+
+    for name, values in series.items():
+        if x_range is not None:
+            values = values.loc[x_range[0]:x_range[1]]
+        values = downsample(values, n_out=n_out, method=method)
+
+        fig.add_trace(go.Scattergl(
+            x=values.index, y=values.to_numpy(), mode="lines", name=name
+        ))
+
+    fig.update_layout(
+        title=title,
+        margin=dict(l=10, r=10, t=40 if title else 10, b=10),
+        hovermode="x unified",
+        legend=dict(orientation="h")
+    )
+    return fig
+
+
+def pred_vs_actual_figure(actual, predicted, limit=SCATTER_LIMIT):
+    """Predicted-vs-actual plot that stays light at any number of points."""
+    actual = np.asarray(actual, dtype=np.float64)
+    predicted = np.asarray(predicted, dtype=np.float64)
+
+    lo = float(min(np.nanmin(actual), np.nanmin(predicted)))
+    hi = float(max(np.nanmax(actual), np.nanmax(predicted)))
+
+    fig = go.Figure()
+    if len(actual) <= limit:
+        fig.add_trace(go.Scattergl(
+            x=actual, y=predicted, mode="markers",
+            marker=dict(size=4, opacity=0.6), name="Predictions"
+        ))
+    else:
+        # Binned here so the payload is the grid, not the points
+        valid = ~(np.isnan(actual) | np.isnan(predicted))
+        counts, x_edges, y_edges = np.histogram2d(
+            actual[valid], predicted[valid], bins=200
+        )
+        fig.add_trace(go.Heatmap(
+            x=(x_edges[:-1] + x_edges[1:]) / 2,
+            y=(y_edges[:-1] + y_edges[1:]) / 2,
+            z=np.where(counts.T > 0, counts.T, np.nan),
+            colorscale="Viridis",
+            name="Density"
+        ))
+
+    fig.add_trace(go.Scatter(
+        x=[lo, hi], y=[lo, hi], mode="lines",
+        line=dict(dash="dash", color="gray"), name="Ideal"
+    ))
+    fig.update_layout(
+        xaxis_title="Actual",
+        yaxis_title="Predicted",
+        margin=dict(l=10, r=10, t=10, b=10)
+    )
+    return fig
+
+
+def distribution_figure(values, bins=100):
+    """Histogram of a large value array, binned before it is sent."""
+    values = np.asarray(values, dtype=np.float64)
+    counts, edges = np.histogram(values[~np.isnan(values)], bins=bins)
+
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2, y=counts,
+        width=np.diff(edges), name="Predictions"
+    ))
+    fig.update_layout(
+        xaxis_title="Predicted value",
+        yaxis_title="Count",
+        margin=dict(l=10, r=10, t=10, b=10)
+    )
+    return fig
@@ -0,0 +1,222 @@
+"""Local incremental price-history store for AlphaFlux.
+
+Each symbol's closing prices live in one Parquet file indexed by date,
+next to a small JSON sidecar recording the date range already fetched
+and when the source was last asked. A query only fetches what lies
+outside that range and could hold a new bar (normally just the missing
+tail, at most every few minutes), merges it in and rewrites the file;
+everything else is a sorted-index slice of a frame cached in memory.
+Fetching is pluggable: ``yahoo_fetcher`` for live data,
+``synthetic_fetcher`` for the offline demo, and ``fixture_fetcher`` for
+CSV fixtures in tests.
+"""
+
+import json
+import re
+import tempfile
+import threading
+import zlib
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+STORE_DIR = Path(tempfile.gettempdir()) / "aetherium" / "prices"
+
+SYNTHETIC_EPOCH = pd.Timestamp("2000-01-03")
+
+# Characters allowed in a store filename; symbols come from user input
+UNSAFE_CHARS = re.compile(r"[^A-Z0-9^=.-]")
+
+
+# ---------------- FETCHERS ---------------- #
+# A fetcher takes (symbol, start, end) and returns a date-indexed Series of
+# closing prices covering that inclusive range (it may be empty).
+
+def yahoo_fetcher(symbol, start, end):
+    import yfinance as yf
+
+    data = yf.download(
+        symbol,
+        start=start,
+        end=end + timedelta(days=1),
+        progress=False,
+        auto_adjust=True
+    )
+    if data.empty:
+        return pd.Series(dtype="float64")
+
+    close = data["Close"]
+    if isinstance(close, pd.DataFrame):
+        close = close.iloc[:, 0]
+    return close.astype("float64")
+
+
+def synthetic_fetcher(symbol, start, end):
+    """Deterministic random walk per symbol on business days.
+
+    The walk always starts at ``SYNTHETIC_EPOCH`` with a symbol-seeded
+    generator, so any sub-range is consistent with every other one.
+    """
+    dates = pd.bdate_range(SYNTHETIC_EPOCH, end)
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    prices = np.cumsum(rng.standard_normal(len(dates))) + 150
+    series = pd.Series(prices, index=dates)
+    return series.loc[pd.Timestamp(start):]
+
+
+def fixture_fetcher(directory):
+    """Fetcher reading ``<directory>/<SYMBOL>.csv`` with date,close columns."""
+    directory = Path(directory)
+
+    def fetch(symbol, start, end):
+        frame = pd.read_csv(
+            directory / f"{symbol}.csv", parse_dates=["date"], index_col="date"
+        )
+        close = frame["close"].sort_index().astype("float64")
+        return close.loc[pd.Timestamp(start):pd.Timestamp(end)]
+
+    return fetch
+
+
+# ---------------- STORE ---------------- #
+# A range that was already asked for is only asked again this often
+# (today's bar may still appear, or a failed download may succeed)
+RECHECK_INTERVAL = timedelta(minutes=15)
+
+
+def last_settled():
+    """The most recent business day whose close can no longer change."""
+    return pd.Timestamp.today().normalize() - pd.offsets.BDay(1)
+
+
+def _extend(covered, part):
+    """Coverage grown by the dates a fetch actually returned.
+
+    An empty fetch (no data, or a failed download) covers nothing, and
+    today's close can still change, so coverage stops at the last
+    settled business day.
+    """
+    if part.empty:
+        return covered
+
+    first, last = part.index.min(), min(part.index.max(), last_settled())
+    if covered is not None:
+        first, last = min(first, covered[0]), max(last, covered[1])
+    return (first, last) if last >= first else covered
+
+
+class PriceStore:
+    def __init__(self, fetcher, root=STORE_DIR):
+        self.fetcher = fetcher
+        self.root = Path(root)
+        self._cache = {}     # symbol -> (series, (first, last) fetched, checks)
+        self._lock = threading.Lock()
+
+    def history(self, symbol, start, end):
+        """Closing prices for ``symbol`` between ``start`` and ``end``.
+
+        Missing ranges are fetched, except where no new bar can exist:
+        past the last business day up to ``end``, or a range asked for
+        in the last ``RECHECK_INTERVAL`` that returned nothing new.
+        """
+        symbol = symbol.upper()
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        now = pd.Timestamp.now()
+
+        with self._lock:
+            series, covered, checks = self._load(symbol)
+
+            parts = []
+            if covered is None:
+                parts.append(self.fetcher(symbol, start, end))
+            else:
+                first, last = covered
+                asked_first, asked_last, checked = checks or (first, last, None)
+                recheck = checked is None or now - checked >= RECHECK_INTERVAL
+
+                if start < first and (start < asked_first or recheck):
+                    parts.append(
+                        self.fetcher(symbol, start, first - timedelta(days=1))
+                    )
+
+                upcoming = last + pd.offsets.BDay(1)
+                if upcoming <= min(end, now.normalize()) \
+                        and (end > asked_last or recheck):
+                    parts.append(
+                        self.fetcher(symbol, last + timedelta(days=1), end)
+                    )
+
+            fetched = bool(parts)
+            parts = [part for part in parts if not part.empty]
+            if parts:
+                for part in parts:
+                    covered = _extend(covered, part)
+                series = pd.concat([series, *parts])
+                series = series[~series.index.duplicated(keep="last")]
+                series = series.sort_index()
+
+            # Nothing is remembered until the source has returned data
+            if fetched and covered is not None:
+                asked = (start, end)
+                if checks is not None:
+                    asked = (min(start, checks[0]), max(end, checks[1]))
+                self._save(
+                    symbol, series, covered, (*asked, now), changed=bool(parts)
+                )
+
+        return series.loc[start:end]
+
+    def _paths(self, symbol):
+        name = UNSAFE_CHARS.sub("_", symbol)
+        if name != symbol or name.strip(".") == "":
+            # Keep sanitised names distinct from each other
+            name = f"{name}-{zlib.crc32(symbol.encode()):08x}"
+        return (
+            self.root / f"{name}.parquet",
+            self.root / f"{name}.json"
+        )
+
+    def _load(self, symbol):
+        if symbol in self._cache:
+            return self._cache[symbol]
+
+        data_path, meta_path = self._paths(symbol)
+        if not (data_path.exists() and meta_path.exists()):
+            return pd.Series(dtype="float64"), None, None
+
+        series = pd.read_parquet(data_path)["close"]
+        meta = json.loads(meta_path.read_text())
+        covered = (pd.Timestamp(meta["first"]), pd.Timestamp(meta["last"]))
+        checks = None
+        if "checked" in meta:
+            checks = (
+                pd.Timestamp(meta["asked_first"]),
+                pd.Timestamp(meta["asked_last"]),
+                pd.Timestamp(meta["checked"])
+            )
+
+        self._cache[symbol] = (series, covered, checks)
+        return series, covered, checks
+
+    def _save(self, symbol, series, covered, checks, changed=True):
+        self.root.mkdir(parents=True, exist_ok=True)
+        data_path, meta_path = self._paths(symbol)
+
+        # A fetch that found nothing new only updates the sidecar
+        if changed or not data_path.exists():
+            series.index = pd.DatetimeIndex(series.index, name="date")
+            tmp = data_path.with_suffix(".tmp")
+            series.rename("close").to_frame().to_parquet(tmp)
+            tmp.replace(data_path)
+
+        meta_path.write_text(json.dumps({
+            "first": covered[0].isoformat(),
+            "last": covered[1].isoformat(),
+            "asked_first": checks[0].isoformat(),
+            "asked_last": checks[1].isoformat(),
+            "checked": checks[2].isoformat()
+        }))
+
+        self._cache[symbol] = (series, covered, checks)
@@ -0,0 +1,183 @@
+"""Tail-latency control for backend calls.
+
+The backend is a render.com instance that cold-starts, so a call may hit
+a sleeping server, a deploy or a transient 5xx. ``core.http`` combines
+the pieces here:
+
+* retries with exponential backoff and full jitter for idempotent calls,
+  only where the backend never started on the request (it could not be
+  reached, or refused it) and within an overall deadline,
+* hedging: a cheap idempotent call still running after the endpoint's
+  p95 latency gets a duplicate, and whichever answers first wins,
+* a circuit breaker per backend, so a dead backend fails fast instead of
+  making every click wait for its own timeout.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+)
+
+import requests
+
+# ---------------- RETRIES ---------------- #
+# Refused before any work was done; a 504 or a read timeout may mean the
+# backend is still busy with the first attempt
+RETRY_STATUSES = {429, 502, 503}
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 0.5        # seconds before the first retry (upper bound)
+BACKOFF_CAP = 8.0
+RETRY_DEADLINE = 30.0     # seconds after which no new attempt starts
+
+# ---------------- HEDGING ---------------- #
+HEDGE_QUANTILE = 0.95
+HEDGE_MIN_SAMPLES = 20    # no hedging until the p95 means something
+LATENCY_WINDOW = 200      # recent successful calls kept per endpoint
+
+# ---------------- CIRCUIT BREAKER ---------------- #
+FAILURE_THRESHOLD = 5     # consecutive failures that open the circuit
+OPEN_SECONDS = 30         # how long to fail fast before probing again
+# Answers meaning the backend itself is down; other errors (a 500 from a
+# bad request, a 4xx) are the request's fault and don't count
+DOWN_STATUSES = {502, 503, 504}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling a backend whose circuit is open."""
+
+
+def backoff(attempt):
+    """Full-jitter exponential backoff delay for retry ``attempt`` (0-based)."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def _retry_after(response):
+    try:
+        return min(float(response.headers.get("Retry-After", "")), BACKOFF_CAP)
+    except ValueError:
+        return None
+
+
+def with_retries(send, attempts=MAX_ATTEMPTS, deadline=RETRY_DEADLINE,
+                 sleep=time.sleep, clock=time.monotonic):
+    """Call ``send()`` until it succeeds or ``attempts`` run out.
+
+    Connection errors (including connect timeouts) and ``RETRY_STATUSES``
+    are retried, but no attempt starts more than ``deadline`` seconds
+    after the first; the last response (or error) is returned (or
+    raised) as-is. Read timeouts are never retried.
+    """
+    started = clock()
+    for attempt in range(attempts):
+        last = attempt == attempts - 1
+        try:
+            response = send()
+        except requests.exceptions.ConnectionError:
+            delay = backoff(attempt)
+            if last or clock() + delay - started > deadline:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or last:
+                return response
+            delay = _retry_after(response) or backoff(attempt)
+            if clock() + delay - started > deadline:
+                return response
+        sleep(delay)
+
+
+class LatencyTracker:
+    """Rolling per-endpoint latencies of successful calls."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds):
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def quantile(self, endpoint, q=HEDGE_QUANTILE, min_samples=HEDGE_MIN_SAMPLES):
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint, ()))
+        if len(samples) < min_samples:
+            return None
+        return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+
+_hedge_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+
+
+def hedged(send, delay):
+    """Run ``send()``; if it takes longer than ``delay``, race a duplicate."""
+    first = _hedge_pool.submit(send)
+    try:
+        return first.result(timeout=delay)
+    except FutureTimeout:
+        pass
+
+    second = _hedge_pool.submit(send)
+    done, _ = wait([first, second], return_when=FIRST_COMPLETED)
+    winner = done.pop()
+    if winner.exception() is None:
+        return winner.result()
+
+    # The first finisher failed; the other attempt is the fallback
+    return (second if winner is first else first).result()
+
+
+# ``CircuitBreaker.allow`` result for the single half-open probe
+PROBE = "probe"
+
+
+class CircuitBreaker:
+    """Closed -> open after ``threshold`` straight failures -> half-open probe."""
+
+    def __init__(self, threshold=FAILURE_THRESHOLD, open_seconds=OPEN_SECONDS):
+        self.threshold = threshold
+        self.open_seconds = open_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def open(self):
+        with self._lock:
+            return self._opened_at is not None
+
+    def allow(self):
+        """False while open; ``PROBE`` for the one half-open call, else True."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.open_seconds:
+                return False
+            # Half-open: let a single request through to test the backend
+            self._probing = True
+            return PROBE
+
+    def record(self, ok, probe=False):
+        """Record a call's outcome; ``None`` says nothing about the backend.
+
+        Pass ``probe=True`` for the call ``allow`` admitted as the probe;
+        only that one settles the half-open state.
+        """
+        with self._lock:
+            if probe:
+                self._probing = False
+            if ok is None:
+                return
+            if ok:
+                self._failures = 0
+                self._opened_at = None
+                return
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
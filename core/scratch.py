@@ -0,0 +1,38 @@
+"""Per-session scratch directories under one bounded root.
+
+Streamlit has no hook for a session ending, so its batch inputs and
+outputs would otherwise pile up in the temp directory. Every session
+directory lives under ``ROOT`` and is touched whenever it is used; each
+new one first removes the ones left untouched for ``MAX_AGE`` seconds.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(tempfile.gettempdir()) / "aetherium" / "scratch"
+MAX_AGE = 6 * 3600
+
+
+def prune(max_age=MAX_AGE):
+    """Remove session directories unused for ``max_age`` seconds."""
+    cutoff = time.time() - max_age
+    for path in ROOT.glob("*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        except FileNotFoundError:
+            pass
+
+
+def session_dir(prefix, current=None):
+    """``current`` if it still exists (marked as used), else a new directory."""
+    if current is not None and Path(current).is_dir():
+        os.utime(current)
+        return Path(current)
+
+    ROOT.mkdir(parents=True, exist_ok=True)
+    prune()
+    return Path(tempfile.mkdtemp(prefix=prefix, dir=ROOT))
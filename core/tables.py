@@ -0,0 +1,133 @@
+"""Columnar table transport (Arrow IPC / Parquet) with JSON fallback.
+
+Requests advertise Arrow and Parquet in ``Accept`` and tables are sent as
+a compressed Arrow IPC stream; the content type of each response decides
+how it is decoded. Backends that only speak JSON keep working: an Arrow
+body answered with 400, 415, 422 or a 5xx is retried as streamed row
+JSON, and JSON responses decode as before. Without pyarrow installed
+everything stays on JSON.
+
+Arrow support is remembered per base URL after the first table POST, so
+a JSON-only backend pays for the rejected Arrow attempt once.
+"""
+
+import io
+import threading
+
+import pandas as pd
+
+from core.uploads import post_chunks, records_json_chunks
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+PARQUET = "application/vnd.apache.parquet"
+JSON = "application/json"
+
+ACCEPT = f"{ARROW_STREAM}, {PARQUET};q=0.9, {JSON};q=0.5" if pa else JSON
+
+BATCH_ROWS = 65_536
+
+# Answers to an Arrow body that mean "send JSON instead" (FastAPI replies
+# 422 to a body it can't validate, some servers fail with a 5xx)
+ARROW_REJECTED = {400, 415, 422}
+
+_arrow_support = {}   # base URL -> True / False once known
+_lock = threading.Lock()
+
+
+def accept_tables(headers=None):
+    """Request headers advertising the columnar formats we can decode."""
+    return {**(headers or {}), "Accept": ACCEPT}
+
+
+def decode_table(response):
+    """Decode a table response according to its content type."""
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+
+    if content_type == ARROW_STREAM:
+        return pa.ipc.open_stream(response.content).read_pandas()
+    if content_type == PARQUET:
+        return pd.read_parquet(io.BytesIO(response.content))
+    return pd.DataFrame(response.json())
+
+
+def arrow_chunks(df, batch_rows=BATCH_ROWS, progress=None):
+    """Yield ``df`` as a zstd-compressed Arrow IPC stream, batch by batch."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = io.BytesIO()
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+
+    def drain():
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    done = 0
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        for batch in table.to_batches(max_chunksize=batch_rows):
+            writer.write_batch(batch)
+            done += batch.num_rows
+            if progress:
+                progress(done, table.num_rows)
+            yield drain()
+    yield drain()
+
+
+def arrow_supported(base_url):
+    """True / False once learned for ``base_url``, None before the first POST."""
+    if pa is None:
+        return False
+    with _lock:
+        return _arrow_support.get(base_url)
+
+
+def _remember(base_url, supported):
+    with _lock:
+        _arrow_support[base_url] = supported
+
+
+def _arrow_rejected(response):
+    return response.status_code in ARROW_REJECTED or response.status_code >= 500
+
+
+def post_table(base_url, endpoint, df, fields=None, headers=None,
+               progress=None):
+    """POST ``df`` plus scalar ``fields``, as Arrow when the backend allows.
+
+    With Arrow, ``fields`` travel as query parameters; with the JSON
+    fallback they are merged into the body next to ``data``.
+    """
+    supported = arrow_supported(base_url)
+
+    if supported is not False:
+        response = post_chunks(
+            base_url,
+            endpoint,
+            lambda: arrow_chunks(df, progress=progress),
+            ARROW_STREAM,
+            headers=headers,
+            params=fields,
+            # Arrow buffers are already zstd-compressed
+            encoding=None
+        )
+        if response.ok:
+            _remember(base_url, True)
+        if supported or not _arrow_rejected(response):
+            return response
+
+    response = post_chunks(
+        base_url,
+        endpoint,
+        lambda: records_json_chunks(df, extra=fields, progress=progress),
+        JSON,
+        headers=headers
+    )
+    if supported is None and response.ok:
+        # JSON went through where Arrow didn't: a JSON-only backend
+        _remember(base_url, False)
+    return response
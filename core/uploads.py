@@ -0,0 +1,320 @@
+"""Streaming, compressed and resumable uploads.
+
+Bodies are produced chunk by chunk from the source file and compressed on
+the fly (zstd when ``zstandard`` is installed, gzip otherwise), so peak
+client memory is one chunk regardless of file size. Already-compressed
+media (PNG, JPEG, ...) is streamed as-is. ``progress(done, total)``
+callbacks report bytes read from the source.
+
+Compression is opt-in per backend: single-request uploads stay
+uncompressed until the backend advertises the coding in an
+``Accept-Encoding`` response header (RFC 7694), and a 415 to a
+compressed body withdraws it again.
+
+Two transports are provided:
+
+* :func:`post_file` streams a multipart form in a single request.
+* :func:`resumable_upload` uses the backend's ``/uploads`` session API,
+  sending fixed-size chunks with ``Content-Range`` and resuming from the
+  server's acknowledged offset after a failed chunk.
+"""
+
+import json
+import os
+import threading
+import uuid
+import zlib
+
+import requests
+
+from core import http
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CHUNK_SIZE = 1024 * 1024
+MAX_CHUNK_RETRIES = 5
+
+DEFAULT_ENCODING = "zstd" if zstandard is not None else "gzip"
+
+# Content types that gain nothing from another compression pass
+PRECOMPRESSED = (
+    "image/png", "image/jpeg", "image/webp", "image/gif",
+    "application/zip", "application/gzip", "application/x-gzip",
+    "application/vnd.apache.parquet"
+)
+
+# Backend answers meaning "this transport/encoding isn't supported"
+UNSUPPORTED = {404, 405, 501}
+ENCODING_REJECTED = {415}
+
+_accepted = {}   # base URL -> content codings it advertised
+_rejected = {}   # base URL -> codings it answered 415 to despite that
+_lock = threading.Lock()
+
+
+def learn_encodings(base_url, response):
+    """Record the content codings ``response`` says its backend accepts."""
+    header = response.headers.get("Accept-Encoding")
+    if header is None:
+        return
+    codings = {c.split(";")[0].strip().lower() for c in header.split(",")}
+    with _lock:
+        _accepted[base_url] = codings - {""} - _rejected.get(base_url, set())
+
+
+def accepts_encoding(base_url, encoding):
+    with _lock:
+        return encoding in _accepted.get(base_url, ())
+
+
+def _reject_encoding(base_url, encoding):
+    """Stop compressing with ``encoding`` after the backend refused it."""
+    with _lock:
+        _rejected.setdefault(base_url, set()).add(encoding)
+        _accepted.get(base_url, set()).discard(encoding)
+
+
+def encoding_for(content_type, encoding=DEFAULT_ENCODING):
+    if content_type and content_type.startswith(PRECOMPRESSED):
+        return None
+    return encoding
+
+
+def _compressor(encoding):
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=3).compressobj()
+    if encoding == "gzip":
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def compress_chunks(chunks, encoding):
+    """Compress an iterator of byte chunks into a single stream."""
+    if not encoding:
+        yield from chunks
+        return
+
+    compressor = _compressor(encoding)
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def compress_bytes(data, encoding):
+    return b"".join(compress_chunks([data], encoding))
+
+
+def file_size(file):
+    position = file.tell()
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(position)
+    return size
+
+
+def read_chunks(file, chunk_size=CHUNK_SIZE, progress=None):
+    """Yield the file from the start in ``chunk_size`` pieces."""
+    total = file_size(file)
+    file.seek(0)
+    done = 0
+
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        done += len(chunk)
+        if progress:
+            progress(done, total)
+        yield chunk
+
+
+def multipart_chunks(boundary, field, filename, file, content_type,
+                     data=None, progress=None):
+    """Yield a ``multipart/form-data`` body without buffering the file."""
+    for name, value in (data or {}).items():
+        yield (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+            f"{value}\r\n"
+        ).encode()
+
+    yield (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; '
+        f'filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode()
+    yield from read_chunks(file, progress=progress)
+    yield f"\r\n--{boundary}--\r\n".encode()
+
+
+def records_json_chunks(df, key="data", extra=None, chunk_rows=10_000,
+                        progress=None):
+    """Yield ``{key: [records...], **extra}`` as JSON, one row block at a time."""
+    yield f'{{"{key}": ['.encode()
+
+    total = len(df)
+    for start in range(0, total, chunk_rows):
+        block = df.iloc[start:start + chunk_rows].to_json(orient="records")
+        if start:
+            yield b","
+        yield block[1:-1].encode()
+        if progress:
+            progress(min(start + chunk_rows, total), total)
+
+    tail = json.dumps(extra or {})[1:-1]
+    yield (f"], {tail}}}" if tail else "]}").encode()
+
+
+def post_chunks(base_url, endpoint, make_chunks, content_type,
+                headers=None, params=None, encoding=DEFAULT_ENCODING,
+                body_key=None, stream=False):
+    """POST a body produced by ``make_chunks()``, compressed on the fly.
+
+    The body is sent with chunked transfer encoding, compressed only if
+    the backend has advertised ``encoding``. If it then rejects the
+    compressed body with a 415, it is rebuilt and sent uncompressed.
+    ``body_key`` identifies the body for the response cache; with
+    ``stream=True`` the response body is left unread (and never cached).
+    """
+    headers = dict(headers or {})
+    headers["Content-Type"] = content_type
+
+    if encoding and accepts_encoding(base_url, encoding):
+        response = http.post(
+            base_url,
+            endpoint,
+            data=compress_chunks(make_chunks(), encoding),
+            headers={**headers, "Content-Encoding": encoding},
+            params=params,
+            body_key=body_key,
+            stream=stream
+        )
+        if response.status_code not in ENCODING_REJECTED:
+            learn_encodings(base_url, response)
+            return response
+        _reject_encoding(base_url, encoding)
+
+    response = http.post(
+        base_url, endpoint, data=make_chunks(), headers=headers, params=params,
+        body_key=body_key, stream=stream
+    )
+    learn_encodings(base_url, response)
+    return response
+
+
+def post_file(base_url, endpoint, file, filename, content_type,
+              field="file", data=None, headers=None, progress=None,
+              encoding=DEFAULT_ENCODING, file_key=None, stream=False):
+    """Stream ``file`` as a multipart upload and return the response.
+
+    Pass the file's content hash as ``file_key`` to let deterministic
+    endpoints answer repeated uploads from the response cache.
+    """
+    boundary = uuid.uuid4().hex
+    body_key = None
+    if file_key is not None:
+        body_key = [file_key, field, filename, content_type, data or {}]
+
+    return post_chunks(
+        base_url,
+        endpoint,
+        lambda: multipart_chunks(
+            boundary, field, filename, file, content_type,
+            data=data, progress=progress
+        ),
+        f"multipart/form-data; boundary={boundary}",
+        headers=headers,
+        encoding=encoding_for(content_type, encoding),
+        body_key=body_key,
+        stream=stream
+    )
+
+
+def resumable_upload(base_url, file, filename, content_type, headers=None,
+                     progress=None, encoding=DEFAULT_ENCODING):
+    """Upload ``file`` through the ``/uploads`` session API.
+
+    Chunks are compressed only with an encoding the backend has
+    advertised, as in :func:`post_chunks`. Returns the backend's
+    completion payload (e.g. ``{"dataset_id": ...}``), or ``None`` when
+    the backend has no resumable upload support.
+    """
+    headers = dict(headers or {})
+    encoding = encoding_for(content_type, encoding)
+    if encoding and not accepts_encoding(base_url, encoding):
+        encoding = None
+    total = file_size(file)
+
+    response = http.post(
+        base_url,
+        "/uploads",
+        json={
+            "filename": filename,
+            "content_type": content_type,
+            "size": total,
+            "encoding": encoding
+        },
+        headers=headers
+    )
+    if response.status_code in UNSUPPORTED:
+        return None
+    response.raise_for_status()
+    learn_encodings(base_url, response)
+    upload_id = response.json()["upload_id"]
+
+    offset = 0
+    failures = 0
+    while offset < total:
+        file.seek(offset)
+        raw = file.read(CHUNK_SIZE)
+
+        chunk_headers = {
+            **headers,
+            "Content-Range": f"bytes {offset}-{offset + len(raw) - 1}/{total}"
+        }
+        if encoding:
+            chunk_headers["Content-Encoding"] = encoding
+
+        try:
+            response = http.request(
+                "PUT",
+                base_url,
+                f"/uploads/{upload_id}",
+                data=compress_bytes(raw, encoding),
+                headers=chunk_headers
+            )
+            if response.status_code not in ENCODING_REJECTED:
+                response.raise_for_status()
+        except requests.exceptions.RequestException:
+            failures += 1
+            if failures > MAX_CHUNK_RETRIES:
+                raise
+            # Resume from whatever the server has acknowledged
+            status = http.get(base_url, f"/uploads/{upload_id}", headers=headers)
+            status.raise_for_status()
+            offset = int(status.json()["offset"])
+            continue
+
+        if response.status_code in ENCODING_REJECTED:
+            # The session is fixed to this encoding, so retrying is no
+            # use; later uploads won't compress with it
+            if encoding:
+                _reject_encoding(base_url, encoding)
+            response.raise_for_status()
+
+        failures = 0
+        offset += len(raw)
+        if progress:
+            progress(offset, total)
+
+    response = http.post(
+        base_url, f"/uploads/{upload_id}/complete", headers=headers
+    )
+    response.raise_for_status()
+    return response.json()
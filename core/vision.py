@@ -0,0 +1,566 @@
+"""Local OpenCV engine for the VisionBlaze operations.
+
+Each backend endpoint has an in-process equivalent: Canny edges, CLAHE
+contrast enhancement, spectral-residual saliency and k-means colour
+segmentation. :class:`ExecutionPlanner` decides per operation whether
+to run locally or call the backend, from the image size and the
+latencies measured so far. :class:`ResultCache` keeps recent results,
+keyed by image hash, operation, parameters and engine, so revisiting a
+setting is free. Backend uploads are downscaled to a working resolution and
+re-encoded (WebP/JPEG) first; very large images for edge detection go
+up as overlapping tiles sent concurrently and stitched back.
+:func:`run_batch` applies one operation to a folder or zip of images
+across a process pool (or a capped number of concurrent backend calls)
+and streams the results to disk.
+"""
+
+import io
+import mimetypes
+import os
+import random
+import shutil
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import (
+    FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+)
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from core import workers
+from core.uploads import post_file
+
+RESULT_CACHE_BYTES = 256 * 1024 * 1024   # bytes of cached results
+PREVIEW_SIDE = 800                       # longest side of the live-preview proxy
+WORKING_SIDE = 4096                      # longest side sent to / processed by default
+TILE_SIDE = 2048                         # images above this go up as tiles
+TILE_OVERLAP = 32                        # context pixels around each tile
+UPLOAD_QUALITY = 85
+
+# Operations whose output pixel depends only on its neighbourhood. The
+# rest must see the whole image: saliency normalisation and k-means colours
+# are global, and CLAHE's histogram grid scales with the image size, so
+# tiles processed separately would not match the whole-image result
+TILEABLE = {"/vision/edges"}
+
+ENCODINGS = {
+    "webp": (".webp", "image/webp", cv2.IMWRITE_WEBP_QUALITY),
+    "jpeg": (".jpg", "image/jpeg", cv2.IMWRITE_JPEG_QUALITY),
+    "png": (".png", "image/png", None)
+}
+
+
+# ---------------- CODEC ---------------- #
+def decode(data):
+    """Decode encoded image bytes to a BGR ``uint8`` array."""
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Could not decode image")
+    return image
+
+
+def decode_result(data):
+    """Decode a result image, keeping single-channel outputs 2-D."""
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_UNCHANGED)
+    if image is None:
+        raise ValueError("Could not decode image")
+    if image.ndim == 3 and image.shape[2] == 4:
+        image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+    return image
+
+
+def encode(image, fmt="webp", quality=UPLOAD_QUALITY):
+    """Encode for upload; returns ``(bytes, filename, content_type)``."""
+    suffix, content_type, quality_flag = ENCODINGS[fmt]
+    flags = [quality_flag, int(quality)] if quality_flag is not None else []
+
+    ok, buffer = cv2.imencode(suffix, image, flags)
+    if not ok:
+        raise ValueError(f"Could not encode image as {fmt}")
+    return buffer.tobytes(), f"image{suffix}", content_type
+
+
+def encode_png(image):
+    ok, buffer = cv2.imencode(".png", image)
+    if not ok:
+        raise ValueError("Could not encode image")
+    return buffer.tobytes()
+
+
+def megapixels(image):
+    return image.shape[0] * image.shape[1] / 1e6
+
+
+def downscale(image, max_side):
+    """Shrink so the longest side is at most ``max_side`` (never enlarges)."""
+    scale = max_side / max(image.shape[:2])
+    if scale >= 1:
+        return image
+    size = (max(1, round(image.shape[1] * scale)), max(1, round(image.shape[0] * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def _gray(image):
+    return image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+# ---------------- OPERATIONS ---------------- #
+def edges(image, t1=80, t2=180):
+    return cv2.Canny(_gray(image), int(t1), int(t2))
+
+
+def contrast(image, clip_limit=2.0, tile=8):
+    """CLAHE on the lightness channel, so colours are preserved."""
+    clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(tile, tile))
+    if image.ndim == 2:
+        return clahe.apply(image)
+
+    lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
+    lab[:, :, 0] = clahe.apply(lab[:, :, 0])
+    return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+
+
+def saliency(image, width=64):
+    """Spectral-residual saliency (Hou & Zhang), as an 8-bit heat map."""
+    gray = _gray(image).astype(np.float32)
+    height = max(1, round(width * gray.shape[0] / gray.shape[1]))
+    small = cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA)
+
+    spectrum = np.fft.fft2(small)
+    log_amplitude = np.log(np.abs(spectrum) + 1e-8).astype(np.float32)
+    phase = np.angle(spectrum)
+
+    residual = log_amplitude - cv2.blur(log_amplitude, (3, 3))
+    saliency_map = np.abs(np.fft.ifft2(np.exp(residual + 1j * phase))) ** 2
+    saliency_map = cv2.GaussianBlur(saliency_map.astype(np.float32), (9, 9), 2.5)
+
+    saliency_map = cv2.resize(
+        saliency_map, (gray.shape[1], gray.shape[0]),
+        interpolation=cv2.INTER_LINEAR
+    )
+    return cv2.normalize(saliency_map, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+
+
+def segment(image, k=4, sample=50_000, seed=0):
+    """K-means colour segmentation; each pixel takes its cluster's colour.
+
+    Centres are fitted on a pixel subsample and every pixel is then
+    assigned to its nearest centre, so cost grows linearly with size.
+    """
+    pixels = image.reshape(-1, image.shape[-1] if image.ndim == 3 else 1)
+    pixels = pixels.astype(np.float32)
+
+    rng = np.random.default_rng(seed)
+    fit = pixels
+    if len(pixels) > sample:
+        fit = pixels[rng.choice(len(pixels), sample, replace=False)]
+
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 1.0)
+    cv2.setRNGSeed(seed)
+    _, _, centers = cv2.kmeans(
+        fit, k, None, criteria, 3, cv2.KMEANS_PP_CENTERS
+    )
+
+    # ||p - c||^2 = ||p||^2 - 2 p.c + ||c||^2; ||p||^2 doesn't change argmin
+    distances = (centers ** 2).sum(axis=1) - 2 * pixels @ centers.T
+    labels = np.argmin(distances, axis=1)
+
+    return centers.astype(np.uint8)[labels].reshape(image.shape)
+
+
+LOCAL_OPERATIONS = {
+    "/vision/edges": edges,
+    "/vision/contrast": contrast,
+    "/vision/saliency": saliency,
+    "/vision/segment": segment
+}
+
+
+def run_local(endpoint, image, params=None):
+    """Run the local equivalent of a backend endpoint on a BGR image."""
+    return LOCAL_OPERATIONS[endpoint](image, **(params or {}))
+
+
+# ---------------- LOCAL / REMOTE PLANNING ---------------- #
+class ExecutionPlanner:
+    """Chooses local or remote execution per operation.
+
+    Keeps an exponential moving average of seconds per megapixel for each
+    (endpoint, backend) pair, plus the remote round-trip overhead, and
+    picks whichever is predicted to be faster for the given image size.
+    Each engine is first measured ``EXPLORE_CALLS`` times (starting with
+    local for images up to ``LOCAL_MAX_MP`` megapixels, remote above;
+    failed calls count, so a backend that is down stops being tried);
+    after that an ``EXPLORE_RATE`` share of calls still goes to the
+    slower one, so its estimate keeps up with a backend that warms up.
+    """
+
+    LOCAL_MAX_MP = 40
+    ALPHA = 0.3
+    EXPLORE_CALLS = 2
+    EXPLORE_RATE = 0.05
+
+    def __init__(self):
+        self._rates = {}        # (endpoint, backend) -> seconds per MP
+        self._calls = {}        # (endpoint, backend) -> calls measured
+        self._overhead = None   # remote round-trip seconds for tiny images
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, backend, mp, seconds):
+        with self._lock:
+            key = (endpoint, backend)
+            self._calls[key] = self._calls.get(key, 0) + 1
+            if backend == "remote" and mp < 0.1:
+                self._overhead = self._ema(self._overhead, seconds)
+                return
+            self._rates[key] = self._ema(
+                self._rates.get(key), seconds / max(mp, 0.1)
+            )
+
+    def record_failure(self, endpoint, backend):
+        """Count a call that never finished, without a timing for it."""
+        with self._lock:
+            key = (endpoint, backend)
+            self._calls[key] = self._calls.get(key, 0) + 1
+
+    def predict(self, endpoint, backend, mp):
+        with self._lock:
+            rate = self._rates.get((endpoint, backend))
+            if rate is None:
+                return None
+            overhead = (self._overhead or 0.0) if backend == "remote" else 0.0
+            return overhead + rate * max(mp, 0.1)
+
+    def choose(self, endpoint, mp):
+        if endpoint not in LOCAL_OPERATIONS:
+            return "remote"
+
+        default = "local" if mp <= self.LOCAL_MAX_MP else "remote"
+        other = "remote" if default == "local" else "local"
+        with self._lock:
+            calls = {b: self._calls.get((endpoint, b), 0) for b in (default, other)}
+
+        # Explore: measure both engines before comparing them
+        for backend in (default, other):
+            if calls[backend] < self.EXPLORE_CALLS:
+                return backend
+
+        local = self.predict(endpoint, "local", mp)
+        remote = self.predict(endpoint, "remote", mp)
+        if local is None or remote is None:
+            return default
+
+        faster, slower = ("local", "remote") if local <= remote else ("remote", "local")
+        return slower if random.random() < self.EXPLORE_RATE else faster
+
+    def _ema(self, previous, value):
+        if previous is None:
+            return value
+        return self.ALPHA * value + (1 - self.ALPHA) * previous
+
+
+planner = ExecutionPlanner()
+
+
+# ---------------- REMOTE ---------------- #
+def post_image(base_url, endpoint, image, params=None, headers=None,
+               fmt="webp", quality=UPLOAD_QUALITY, progress=None):
+    """Re-encode ``image``, send it to the backend and decode the result."""
+    data, filename, content_type = encode(image, fmt, quality)
+    response = post_file(
+        base_url, endpoint, io.BytesIO(data), filename, content_type,
+        data=params, headers=headers, progress=progress
+    )
+    response.raise_for_status()
+    return decode_result(response.content)
+
+
+def tile_grid(height, width, tile=TILE_SIDE, overlap=TILE_OVERLAP):
+    """``(core, padded)`` boxes as ``(y0, y1, x0, x1)`` covering the image."""
+    boxes = []
+    for y0 in range(0, height, tile):
+        for x0 in range(0, width, tile):
+            y1, x1 = min(y0 + tile, height), min(x0 + tile, width)
+            padded = (
+                max(y0 - overlap, 0), min(y1 + overlap, height),
+                max(x0 - overlap, 0), min(x1 + overlap, width)
+            )
+            boxes.append(((y0, y1, x0, x1), padded))
+    return boxes
+
+
+def process_tiled(image, process, tile=TILE_SIDE, overlap=TILE_OVERLAP,
+                  max_workers=4, progress=None):
+    """Run ``process(tile_image) -> array`` on overlapping tiles concurrently.
+
+    Each tile carries ``overlap`` pixels of context on every side; only
+    its core is copied into the output, so filters see no seams.
+    """
+    boxes = tile_grid(image.shape[0], image.shape[1], tile, overlap)
+    output = None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(process, image[p[0]:p[1], p[2]:p[3]]): (core, p)
+            for core, p in boxes
+        }
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            (y0, y1, x0, x1), (py0, py1, px0, px1) = futures[future]
+            result = future.result()
+            if result.shape[:2] != (py1 - py0, px1 - px0):
+                result = cv2.resize(
+                    result, (px1 - px0, py1 - py0), interpolation=cv2.INTER_NEAREST
+                )
+
+            if output is None:
+                output = np.zeros(image.shape[:2] + result.shape[2:], result.dtype)
+            output[y0:y1, x0:x1] = result[y0 - py0:y1 - py0, x0 - px0:x1 - px0]
+
+            if progress is not None:
+                progress(done, len(boxes))
+
+    return output
+
+
+def process_remote(base_url, endpoint, image, params=None, headers=None,
+                   fmt="webp", quality=UPLOAD_QUALITY, tile=TILE_SIDE,
+                   max_workers=4, progress=None):
+    """Send ``image`` whole, or as concurrent tiles when it is large."""
+    send = lambda part: post_image(
+        base_url, endpoint, part, params=params, headers=headers,
+        fmt=fmt, quality=quality
+    )
+
+    if endpoint in TILEABLE and max(image.shape[:2]) > tile:
+        return process_tiled(
+            image, send, tile=tile, max_workers=max_workers, progress=progress
+        )
+
+    result = send(image)
+    if progress is not None:
+        progress(1, 1)
+    return result
+
+
+# ---------------- RESULT CACHE ---------------- #
+class ResultCache:
+    """Byte-bounded LRU of results (arrays or encoded bytes).
+
+    Keys come from :meth:`key`: the image's content hash, the operation,
+    its parameters and the working resolution (``None`` for full size).
+    """
+
+    def __init__(self, limit=RESULT_CACHE_BYTES):
+        self.limit = limit
+        self._items = OrderedDict()    # key -> (value, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(image_key, endpoint, params=None, side=None, target=None,
+            upload=None):
+        """``target`` ("local" / "remote") keeps the two engines' results apart.
+
+        ``upload`` is the ``(fmt, quality)`` a backend result was sent with;
+        a lossy re-encode changes what the backend saw.
+        """
+        return (
+            image_key, endpoint, tuple(sorted((params or {}).items())), side,
+            target, upload
+        )
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key][0]
+
+    def put(self, key, value):
+        nbytes = value.nbytes if isinstance(value, np.ndarray) else len(value)
+
+        with self._lock:
+            if key in self._items:
+                self._bytes -= self._items.pop(key)[1]
+            self._items[key] = (value, nbytes)
+            self._bytes += nbytes
+
+            # Always keep the newest entry, even if it alone is over the limit
+            while self._bytes > self.limit and len(self._items) > 1:
+                _, (_, size) = self._items.popitem(last=False)
+                self._bytes -= size
+
+    def cached(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+
+results = ResultCache()
+
+
+# ---------------- BATCH ---------------- #
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp"}
+
+
+def list_images(source):
+    """Image names in a folder (recursive) or zip archive, sorted."""
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            names = archive.namelist()
+    else:
+        root = Path(source)
+        names = [str(p.relative_to(root)) for p in root.rglob("*") if p.is_file()]
+
+    return sorted(n for n in names if Path(n).suffix.lower() in IMAGE_SUFFIXES)
+
+
+def iter_images(source, names=None):
+    """Yield ``(name, bytes)`` for each image, reading one at a time."""
+    names = list_images(source) if names is None else names
+
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for name in names:
+                yield name, archive.read(name)
+    else:
+        root = Path(source)
+        for name in names:
+            yield name, (root / name).read_bytes()
+
+
+def safe_path(root, name):
+    """``name`` (from an upload or archive) as a path that stays under ``root``."""
+    anchor = Path(name).anchor
+    parts = [p for p in Path(name).parts if p not in ("..", ".", anchor)]
+    return Path(root, *parts)
+
+
+def output_path(out_dir, name):
+    """Mirror the input layout under ``out_dir``, always as PNG."""
+    return safe_path(out_dir, name).with_suffix(".png")
+
+
+def mimetype(name):
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+
+def _unique(path):
+    """``path``, or ``name (n).ext`` beside it if that is already taken."""
+    candidate, n = path, 1
+    while candidate.exists():
+        candidate = path.with_name(f"{path.stem} ({n}){path.suffix}")
+        n += 1
+    return candidate
+
+
+def stage_uploads(files, directory):
+    """Write uploaded images, and the images inside uploaded zips, to ``directory``.
+
+    ``directory`` is emptied first. Zip members land under a folder named
+    after their archive; uploads sharing a name are kept apart as
+    ``name (1).png`` and so on. Returns ``directory`` as a batch source.
+    """
+    directory = Path(directory)
+    shutil.rmtree(directory, ignore_errors=True)
+    directory.mkdir(parents=True)
+
+    for file in files:
+        if Path(file.name).suffix.lower() == ".zip":
+            folder = _unique(directory / Path(file.name).stem)
+            folder.mkdir()
+            with zipfile.ZipFile(file) as archive:
+                for name in archive.namelist():
+                    if Path(name).suffix.lower() in IMAGE_SUFFIXES:
+                        path = _unique(safe_path(folder, name))
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                        path.write_bytes(archive.read(name))
+        elif Path(file.name).suffix.lower() in IMAGE_SUFFIXES:
+            path = _unique(safe_path(directory, Path(file.name).name))
+            path.write_bytes(file.getvalue())
+
+    return directory
+
+
+def zip_results(out_dir, names, path):
+    """Bundle the outputs for ``names`` into the zip file at ``path``."""
+    with zipfile.ZipFile(path, "w") as bundle:
+        for name in names:
+            output = output_path(out_dir, name)
+            bundle.write(output, output.relative_to(out_dir))
+    return path
+
+
+def _local_job(endpoint, params, name, data, out_dir):
+    path = output_path(out_dir, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(encode_png(run_local(endpoint, decode(data), params)))
+    return len(data)
+
+
+def _remote_job(remote, name, data, out_dir):
+    path = output_path(out_dir, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(remote(name, data))
+    return len(data)
+
+
+def run_batch(source, endpoint, out_dir, params=None, remote=None,
+              max_workers=None, names=None):
+    """Apply one operation to every image in ``source``.
+
+    Runs the local engine in a process pool, or, when ``remote`` is given
+    (a ``(name, data) -> bytes`` callable), at most ``max_workers``
+    concurrent backend calls. Only about two images per worker are in
+    flight at once, so memory stays flat for any batch size. Yields
+    ``(name, size, error)`` as each image finishes, where ``size`` is the
+    byte size of the input image read from ``source`` (0 if it failed).
+    """
+    if remote is None:
+        max_workers = max_workers or os.cpu_count() or 1
+        # Never forked: see core.workers
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=workers.context(__name__)
+        )
+
+        def submit(name, data):
+            # The pool starts its processes on submit
+            with workers.detached_main():
+                return executor.submit(
+                    _local_job, endpoint, params, name, data, out_dir
+                )
+    else:
+        max_workers = max_workers or 4
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        submit = lambda name, data: executor.submit(
+            _remote_job, remote, name, data, out_dir
+        )
+
+    images = iter_images(source, names)
+    pending = {}
+
+    try:
+        while True:
+            for name, data in images:
+                pending[submit(name, data)] = name
+                if len(pending) >= 2 * max_workers:
+                    break
+
+            if not pending:
+                return
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    yield name, future.result(), None
+                except Exception as e:
+                    yield name, 0, e
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,43 @@
+"""Worker processes for CPU-bound work under Streamlit.
+
+Streamlit serves pages from a multi-threaded server, and forking a
+threaded process can deadlock the child, so worker processes come from a
+forkserver (or spawn where there is none). Both start a child by
+re-importing ``__main__`` from its path, and Streamlit registers the page
+script being run as ``__main__``: :func:`detached_main` hides it while
+children start, so they don't re-run the page.
+"""
+
+import multiprocessing as mp
+import sys
+import threading
+import types
+from contextlib import contextmanager
+
+_preload = set()
+_lock = threading.Lock()
+
+
+def context(*preload):
+    """Forkserver (or spawn) context; ``preload`` modules load once in the server."""
+    if "forkserver" not in mp.get_all_start_methods():
+        return mp.get_context("spawn")
+
+    ctx = mp.get_context("forkserver")
+    with _lock:
+        _preload.update(preload)
+        # Only takes effect before the server's first start
+        ctx.set_forkserver_preload(sorted(_preload))
+    return ctx
+
+
+@contextmanager
+def detached_main():
+    """Start child processes without them importing ``__main__``."""
+    with _lock:
+        main = sys.modules["__main__"]
+        sys.modules["__main__"] = types.ModuleType("__main__")
+        try:
+            yield
+        finally:
+            sys.modules["__main__"] = main
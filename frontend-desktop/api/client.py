@@ -1,9 +1,40 @@
-import requests
+import io
+import os
+import sys
+from pathlib import Path
 
-BASE_URL = "https://aetherium-ai-backend.onrender.com"
+# Shared modules live in the repository root (core/)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from core import http
+from core.tables import post_table as _post_table
+from core.uploads import post_file
+
+BASE_URL = os.environ.get(
+    "AETHERIUM_BACKEND_URL", "https://aetherium-ai-backend.onrender.com"
+)
 
 def post(endpoint, payload=None, files=None):
-    url = f"{BASE_URL}{endpoint}"
-    response = requests.post(url, json=payload, files=files)
+    response = http.post(BASE_URL, endpoint, json=payload, files=files)
     response.raise_for_status()
     return response.json()
+
+
+def post_table(endpoint, df, fields=None, progress=None):
+    """POST a DataFrame as Arrow IPC, falling back to streamed JSON."""
+    response = _post_table(
+        BASE_URL, endpoint, df, fields=fields, progress=progress
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def post_image_streamed(endpoint, data, filename, content_type, params=None,
+                        progress=None):
+    """Upload image bytes and return the response with its body unread."""
+    response = post_file(
+        BASE_URL, endpoint, io.BytesIO(data), filename, content_type,
+        data=params, progress=progress, stream=True
+    )
+    response.raise_for_status()
+    return response
@@ -1,6 +1,11 @@
 import sys
 from PySide6.QtWidgets import QApplication
 from ui.main_window import MainWindow
+from api.client import BASE_URL
+from core import http
+
+# Wake the cold-starting backend while the window opens
+http.warmup(BASE_URL)
 
 app = QApplication(sys.argv)
 window = MainWindow()
@@ -3,6 +3,7 @@ from PySide6.QtWidgets import (
     QPushButton, QLineEdit
 )
 from api.client import post
+from ui.tasks import TaskPanel
 
 class AlphaFluxWidget(QWidget):
     def __init__(self):
@@ -14,6 +15,7 @@ class AlphaFluxWidget(QWidget):
         self.symbol_input = QLineEdit("AAPL")
         self.btn_run = QPushButton("Run Forecast")
         self.output = QLabel("Result will appear here")
+        self.tasks = TaskPanel()
 
         self.btn_run.clicked.connect(self.run_forecast)
 
@@ -21,22 +23,30 @@ class AlphaFluxWidget(QWidget):
         layout.addWidget(QLabel("Stock Symbol"))
         layout.addWidget(self.symbol_input)
         layout.addWidget(self.btn_run)
+        layout.addWidget(self.tasks)
         layout.addWidget(self.output)
 
         self.setLayout(layout)
 
     def run_forecast(self):
-        result = post(
+        self.tasks.submit(
+            post,
             "/workflow/alphaflux/forecast",
             payload={
                 "symbol": self.symbol_input.text(),
                 "start_date": "2020-01-01",
                 "end_date": "2024-01-01",
                 "horizon": 10
-            }
+            },
+            on_result=self.show_result,
+            on_error=self.show_error
         )
 
+    def show_result(self, result):
         self.output.setText(
             f"Signal: {result['signal']}\n"
             f"Confidence: {round(result['confidence'], 2)}"
         )
+
+    def show_error(self, message):
+        self.output.setText(f"Request failed: {message}")
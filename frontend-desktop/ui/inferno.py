@@ -1,5 +1,10 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QLabel,
+    QPushButton, QMessageBox
+)
 from api.client import post
+from ui.tasks import TaskPanel
+import json
 
 class InfernoWidget(QWidget):
     def __init__(self):
@@ -8,16 +13,33 @@ class InfernoWidget(QWidget):
 
         label = QLabel("InfernoData Desktop Module")
         btn = QPushButton("Run Preprocess")
+        self.output = QLabel("Result will appear here")
+        self.tasks = TaskPanel()
 
         btn.clicked.connect(self.run)
 
         layout.addWidget(label)
         layout.addWidget(btn)
+        layout.addWidget(self.tasks)
+        layout.addWidget(self.output)
         self.setLayout(layout)
 
     def run(self):
-        result = post("/inferno/preprocess", payload=[
-            {"a": 1, "b": 2},
-            {"a": 3, "b": 4}
-        ])
-        print(result)
+        self.output.setText("Preprocessing...")
+        self.tasks.submit(
+            post,
+            "/inferno/preprocess",
+            payload=[
+                {"a": 1, "b": 2},
+                {"a": 3, "b": 4}
+            ],
+            on_result=self.show_result,
+            on_error=self.show_error
+        )
+
+    def show_result(self, result):
+        self.output.setText(json.dumps(result, indent=2))
+
+    def show_error(self, message):
+        self.output.setText("Preprocess failed")
+        QMessageBox.warning(self, "InfernoData", f"Request failed: {message}")
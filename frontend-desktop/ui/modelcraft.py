@@ -3,7 +3,8 @@ from PySide6.QtWidgets import (
     QPushButton, QFileDialog
 )
 import pandas as pd
-from api.client import post
+from api.client import post_table
+from ui.tasks import TaskPanel
 
 class ModelCraftWidget(QWidget):
     def __init__(self):
@@ -15,6 +16,7 @@ class ModelCraftWidget(QWidget):
         self.btn_upload = QPushButton("Upload Dataset")
         self.btn_run = QPushButton("Run Benchmark")
         self.output = QLabel("No results yet")
+        self.tasks = TaskPanel()
 
         self.btn_upload.clicked.connect(self.upload_file)
         self.btn_run.clicked.connect(self.run_benchmark)
@@ -22,6 +24,7 @@ class ModelCraftWidget(QWidget):
         layout.addWidget(self.label)
         layout.addWidget(self.btn_upload)
         layout.addWidget(self.btn_run)
+        layout.addWidget(self.tasks)
         layout.addWidget(self.output)
 
         self.setLayout(layout)
@@ -43,15 +46,32 @@ class ModelCraftWidget(QWidget):
 
         target = self.data.columns[-1]
 
-        result = post(
+        self.output.setText("Benchmark running...")
+        self.tasks.submit(
+            self.benchmark,
+            self.data,
+            target,
+            on_result=self.show_result,
+            on_error=self.show_error,
+            with_progress=True
+        )
+
+    @staticmethod
+    def benchmark(data, target, progress):
+        # Runs on a worker thread; the table streams out as Arrow
+        # record batches (or row-block JSON for older backends)
+        return post_table(
             "/modelcraft/benchmark",
-            payload={
-                "data": self.data.to_dict(orient="records"),
-                "target": target
-            }
+            data,
+            fields={"target": target},
+            progress=lambda done, total: progress(100 * done / max(total, 1))
         )
 
+    def show_result(self, result):
         self.output.setText(
             f"Best Model: {result['best_model']}\n"
             f"Score: {round(result['final_score'], 4)}"
         )
+
+    def show_error(self, message):
+        self.output.setText(f"Benchmark failed: {message}")
@@ -0,0 +1,136 @@
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QProgressBar, QPushButton
+
+# Backend calls are I/O bound, so allow more threads than cores
+MAX_THREADS = max(8, QThreadPool.globalInstance().maxThreadCount())
+QThreadPool.globalInstance().setMaxThreadCount(MAX_THREADS)
+
+
+class WorkerSignals(QObject):
+    result = Signal(object)
+    error = Signal(str)
+    progress = Signal(int)
+    partial = Signal(object)
+    finished = Signal()
+
+
+class Worker(QRunnable):
+    """Runs ``fn(*args, **kwargs)`` on the global thread pool.
+
+    Results come back to the GUI thread through ``signals``. If ``fn``
+    accepts a ``progress`` keyword it receives a callback taking 0-100,
+    and a ``partial`` keyword one for intermediate results.
+    Cancelling cannot abort a request already on the wire, but its result
+    is dropped instead of being delivered.
+    """
+
+    def __init__(self, fn, *args, with_progress=False, with_partial=False,
+                 **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self._cancelled = threading.Event()
+        self.reports_progress = with_progress
+
+        if with_progress:
+            self.kwargs["progress"] = self._report_progress
+        if with_partial:
+            self.kwargs["partial"] = self._report_partial
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def _report_progress(self, value):
+        if not self.cancelled:
+            self.signals.progress.emit(int(value))
+
+    def _report_partial(self, value):
+        if not self.cancelled:
+            self.signals.partial.emit(value)
+
+    @Slot()
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.error.emit(str(e))
+        else:
+            if not self.cancelled:
+                self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+class TaskPanel(QWidget):
+    """Progress bar and cancel button tracking a widget's in-flight calls."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.progress = QProgressBar()
+        self.btn_cancel = QPushButton("Cancel")
+        self.btn_cancel.clicked.connect(self.cancel_all)
+
+        layout.addWidget(self.progress)
+        layout.addWidget(self.btn_cancel)
+        self.setLayout(layout)
+
+        self._workers = set()
+        self._update()
+
+    def submit(self, fn, *args, on_result=None, on_error=None,
+               on_partial=None, with_progress=False, **kwargs):
+        worker = Worker(
+            fn, *args, with_progress=with_progress,
+            with_partial=on_partial is not None, **kwargs
+        )
+
+        if on_result:
+            worker.signals.result.connect(on_result)
+        if on_partial:
+            worker.signals.partial.connect(on_partial)
+        if on_error:
+            worker.signals.error.connect(on_error)
+        worker.signals.progress.connect(self.progress.setValue)
+        worker.signals.finished.connect(lambda: self._done(worker))
+
+        self._workers.add(worker)
+        self._update()
+        QThreadPool.globalInstance().start(worker)
+        return worker
+
+    def cancel_all(self):
+        for worker in list(self._workers):
+            worker.cancel()
+        self._workers.clear()
+        self._update()
+
+    def _done(self, worker):
+        self._workers.discard(worker)
+        self._update()
+
+    def _update(self):
+        busy = bool(self._workers)
+        self.btn_cancel.setEnabled(busy)
+        self.progress.setVisible(busy)
+
+        # Percent only makes sense for a single reporting call,
+        # otherwise show a busy indicator
+        determinate = (
+            len(self._workers) == 1
+            and next(iter(self._workers)).reports_progress
+        )
+        self.progress.setRange(0, 100 if determinate else 0)
+        self.progress.setFormat(f"{len(self._workers)} request(s) running")
@@ -1,5 +1,9 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QTextEdit, QPushButton
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QTextEdit,
+    QLabel, QPushButton, QMessageBox
+)
 from api.client import post
+from ui.tasks import TaskPanel
 
 class TextVortexWidget(QWidget):
     def __init__(self):
@@ -8,15 +12,33 @@ class TextVortexWidget(QWidget):
 
         self.text = QTextEdit()
         btn = QPushButton("Analyze Sentiment")
+        self.output = QLabel("Result will appear here")
+        self.tasks = TaskPanel()
 
         btn.clicked.connect(self.run)
 
         layout.addWidget(self.text)
         layout.addWidget(btn)
+        layout.addWidget(self.tasks)
+        layout.addWidget(self.output)
         self.setLayout(layout)
 
     def run(self):
-        result = post("/text/sentiment", payload={
-            "text": self.text.toPlainText()
-        })
-        print(result)
+        self.output.setText("Analyzing...")
+        self.tasks.submit(
+            post,
+            "/text/sentiment",
+            payload={"text": self.text.toPlainText()},
+            on_result=self.show_result,
+            on_error=self.show_error
+        )
+
+    def show_result(self, result):
+        if isinstance(result, dict):
+            self.output.setText("\n".join(f"{k}: {v}" for k, v in result.items()))
+        else:
+            self.output.setText(str(result))
+
+    def show_error(self, message):
+        self.output.setText("Analysis failed")
+        QMessageBox.warning(self, "TextVortex", f"Request failed: {message}")
@@ -2,10 +2,21 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel,
     QPushButton, QFileDialog
 )
-from PySide6.QtGui import QPixmap
-from api.client import post
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice, Qt
+from PySide6.QtGui import QImage, QImageReader, QPixmap
+from api.client import post_image_streamed
+import mimetypes
+import os
 import requests
-import tempfile
+import time
+from core import vision
+from ui.tasks import TaskPanel
+
+DISPLAY_WIDTH = 400
+
+# Streamed results are re-decoded each time the received prefix doubles
+STREAM_CHUNK = 64 * 1024
+FIRST_PARTIAL = 128 * 1024
 
 class VisionBlazeWidget(QWidget):
     def __init__(self):
@@ -20,14 +31,19 @@ class VisionBlazeWidget(QWidget):
 
         self.btn_upload = QPushButton("Upload Image")
         self.btn_edge = QPushButton("Run Edge Detection")
+        self.btn_batch = QPushButton("Batch Edge Detection (Folder)")
+        self.tasks = TaskPanel()
 
         self.btn_upload.clicked.connect(self.upload_image)
         self.btn_edge.clicked.connect(self.run_edge)
+        self.btn_batch.clicked.connect(self.run_batch)
 
         layout.addWidget(self.label)
         layout.addWidget(self.image_label)
         layout.addWidget(self.btn_upload)
         layout.addWidget(self.btn_edge)
+        layout.addWidget(self.btn_batch)
+        layout.addWidget(self.tasks)
 
         self.setLayout(layout)
 
@@ -39,20 +55,178 @@ class VisionBlazeWidget(QWidget):
         )
         if path:
             self.image_path = path
-            self.image_label.setPixmap(QPixmap(path).scaledToWidth(400))
+            self.image_label.setPixmap(QPixmap(path).scaledToWidth(DISPLAY_WIDTH))
 
     def run_edge(self):
         if not self.image_path:
             self.label.setText("Please upload an image first")
             return
 
-        files = {"file": open(self.image_path, "rb")}
-        res = requests.post(
-            "http://localhost:8000/vision/edges",
-            files=files,
-            data={"t1": 80, "t2": 180}
+        self.tasks.submit(
+            self.detect_edges,
+            self.image_path,
+            on_result=self.show_result,
+            on_error=self.label.setText,
+            on_partial=self.show_result,
+            with_progress=True
+        )
+
+    def run_batch(self):
+        source = QFileDialog.getExistingDirectory(self, "Select Image Folder")
+        if not source:
+            return
+        out_dir = QFileDialog.getExistingDirectory(self, "Select Output Folder")
+        if not out_dir:
+            return
+
+        self.label.setText("Batch running...")
+        self.tasks.submit(
+            self.batch_edges,
+            source,
+            out_dir,
+            on_result=self.label.setText,
+            on_error=self.label.setText,
+            with_progress=True
+        )
+
+    @staticmethod
+    def batch_edges(source, out_dir, progress):
+        names = vision.list_images(source)
+        if not names:
+            return "No images found"
+
+        failed = 0
+        started = time.perf_counter()
+        # Local engine across all cores, results written as they finish
+        for done, (_, _, error) in enumerate(vision.run_batch(
+            source, "/vision/edges", out_dir,
+            params={"t1": 80, "t2": 180}, names=names
+        ), start=1):
+            failed += error is not None
+            progress(int(done * 100 / len(names)))
+
+        elapsed = time.perf_counter() - started
+        return (
+            f"Processed {len(names) - failed}/{len(names)} images in "
+            f"{elapsed:.1f} s ({len(names) / elapsed:.1f} images/s) -> {out_dir}"
+        )
+
+    @staticmethod
+    def detect_edges(image_path, progress, partial):
+        params = {"t1": 80, "t2": 180}
+        with open(image_path, "rb") as f:
+            data = f.read()
+
+        # Only the header is read here; pixels are decoded for local runs
+        mp = megapixels(data)
+        started = time.perf_counter()
+
+        # In-process Canny unless the backend has measured faster (or is
+        # being measured); an unreachable backend falls back to local
+        if vision.planner.choose("/vision/edges", mp) == "remote":
+            try:
+                response = post_image_streamed(
+                    "/vision/edges",
+                    data,
+                    os.path.basename(image_path),
+                    mimetypes.guess_type(image_path)[0] or "application/octet-stream",
+                    params=params,
+                    progress=lambda done, total: progress(80 * done // max(total, 1))
+                )
+                with response:
+                    result = decode_stream(
+                        response,
+                        partial=partial,
+                        progress=lambda done, total: progress(80 + 20 * done // max(total, 1))
+                    )
+            except requests.exceptions.ConnectionError:
+                vision.planner.record_failure("/vision/edges", "remote")
+                started = time.perf_counter()
+            else:
+                vision.planner.record(
+                    "/vision/edges", "remote", mp, time.perf_counter() - started
+                )
+                progress(100)
+                return result
+
+        output = vision.edges(vision.decode(data), **params)
+        vision.planner.record(
+            "/vision/edges", "local", mp, time.perf_counter() - started
         )
+        progress(100)
+        return to_qimage(output)
+
+    def show_result(self, image):
+        # Decoded off the GUI thread; only the pixmap upload happens here
+        self.image_label.setPixmap(QPixmap.fromImage(image))
+
+
+# ---------------- DECODING ---------------- #
+def to_qimage(array, width=DISPLAY_WIDTH):
+    """Wrap a uint8 grayscale/BGR array as a QImage scaled for display."""
+    height, cols = array.shape[:2]
+    if array.ndim == 2:
+        image = QImage(array.data, cols, height, array.strides[0], QImage.Format_Grayscale8)
+    else:
+        image = QImage(array.data, cols, height, array.strides[0], QImage.Format_BGR888)
+    # scaled() copies, so the result no longer points into ``array``
+    return image.scaledToWidth(width, Qt.SmoothTransformation)
+
+
+def _reader(content):
+    buffer = QBuffer()
+    buffer.setData(QByteArray(content))
+    buffer.open(QIODevice.ReadOnly)
+    # The reader doesn't own the buffer: keep it alive alongside
+    return QImageReader(buffer), buffer
+
+
+def megapixels(content):
+    """Image size in megapixels, from the header alone."""
+    reader, _ = _reader(content)
+    size = reader.size()
+    return size.width() * size.height() / 1e6 if size.isValid() else 0.0
+
+
+def decode_for_display(content, width=DISPLAY_WIDTH):
+    """Decode response bytes in memory, straight to display resolution.
+
+    The reader scales while decoding, so a large result never
+    materialises at full size and no temp file is written.
+    """
+    reader, _ = _reader(content)
+    size = reader.size()
+    if size.isValid() and size.width() > width:
+        reader.setScaledSize(size.scaled(width, size.height(), Qt.KeepAspectRatio))
+
+    image = reader.read()
+    if image.isNull():
+        raise ValueError(f"Could not decode result: {reader.errorString()}")
+    return image
+
+
+def decode_stream(response, partial=None, progress=None, width=DISPLAY_WIDTH):
+    """Read a streamed image response and decode it for display.
+
+    A JPEG prefix decodes to the rows received so far (the rest is grey),
+    so JPEG results are passed to ``partial`` each time the received
+    data doubles. Qt's PNG reader needs the whole file, so other formats
+    are shown once complete.
+    """
+    total = int(response.headers.get("Content-Length") or 0)
+    content = bytearray()
+    next_partial = FIRST_PARTIAL
+
+    for chunk in response.iter_content(STREAM_CHUNK):
+        content += chunk
+        if progress and total:
+            progress(len(content), total)
+
+        if partial and content[:3] == b"\xff\xd8\xff" and len(content) >= next_partial:
+            next_partial = 2 * len(content)
+            try:
+                partial(decode_for_display(bytes(content), width))
+            except ValueError:
+                pass
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as f:
-            f.write(res.content)
-            self.image_label.setPixmap(QPixmap(f.name).scaledToWidth(400))
+    return decode_for_display(bytes(content), width)
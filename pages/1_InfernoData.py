@@ -1,6 +1,11 @@
 import streamlit as st
 import requests
-import pandas as pd
+
+from core import http
+from core.datasets import load_csv, profile, key_for
+from core.handles import post_dataset
+from core.plotting import distribution_figure, pred_vs_actual_figure
+from core.tables import accept_tables, decode_table
 
 st.set_page_config(page_title="InfernoData", page_icon="🔥", layout="wide")
 st.title("🔥 InfernoData – Dataset Engineering Engine")
@@ -11,6 +16,30 @@ API_KEY = st.secrets["API_KEY"]
 
 headers = {"X-API-Key": API_KEY}
 
+
+def upload_progress(label="Uploading dataset"):
+    """Progress callback that only shows a bar once bytes are actually sent."""
+    slot = st.empty()
+
+    def update(done, total):
+        slot.progress(
+            min(done / max(total, 1), 1.0),
+            text=f"{label}: {done / 1e6:.1f} / {total / 1e6:.1f} MB"
+        )
+
+    return update
+
+
+def compact(result, limit=20):
+    """Backend payload with long arrays summarised, for display."""
+    return {
+        key: (
+            f"<{len(value)} values>"
+            if isinstance(value, list) and len(value) > limit else value
+        )
+        for key, value in result.items()
+    }
+
 # ---------------- SIDEBAR ---------------- #
 mode = st.sidebar.radio(
     "Select Operation",
@@ -31,15 +60,15 @@ if mode == "Dataset Generator":
 
     if st.button("Generate Dataset"):
         try:
-            response = requests.post(
-                f"{BACKEND_URL}/inferno/generate",
+            response = http.post(
+                BACKEND_URL,
+                "/inferno/generate",
                 json={"rows": rows, "cols": cols},
-                headers=headers,
-                timeout=60
+                headers=accept_tables(headers)
             )
 
             if response.status_code == 200:
-                df = pd.DataFrame(response.json())
+                df = decode_table(response)
                 st.success("Dataset generated")
                 st.dataframe(df)
             else:
@@ -55,16 +84,17 @@ elif mode == "Dataset Trimmer":
     file = st.file_uploader("Upload CSV", type=["csv"])
     if file and st.button("Trim Dataset"):
         try:
-            files = {"file": file}
-            response = requests.post(
-                f"{BACKEND_URL}/inferno/trim",
-                files=files,
-                headers=headers,
-                timeout=60
+            response = post_dataset(
+                BACKEND_URL,
+                "/inferno/trim",
+                file,
+                key_for(file),
+                headers=accept_tables(headers),
+                progress=upload_progress()
             )
 
             if response.status_code == 200:
-                df = pd.DataFrame(response.json())
+                df = decode_table(response)
                 st.success("Dataset trimmed")
                 st.dataframe(df)
             else:
@@ -80,15 +110,13 @@ elif mode == "Classification":
     file = st.file_uploader("Upload CSV", type=["csv"])
 
     if file:
-        df = pd.read_csv(file)
+        dataset_key, df = load_csv(file)
         st.subheader("Dataset Preview")
         st.dataframe(df.head())
 
-        # 🔥 VALID TARGET FILTER
-        valid_targets = [
-            col for col in df.columns
-            if df[col].nunique() <= 10
-        ]
+        # 🔥 VALID TARGET FILTER (from the cached column profile)
+        columns = profile(dataset_key)
+        valid_targets = columns.index[columns["n_unique"] <= 10].tolist()
 
         if not valid_targets:
             st.error("No valid classification target found (need categorical column)")
@@ -103,20 +131,15 @@ elif mode == "Classification":
 
         if st.button("Run Classification"):
             try:
-                files = {
-                    "file": (
-                        file.name,
-                        file.getvalue(),
-                        file.type
-                    )
-                }
-
-                response = requests.post(
-                    f"{BACKEND_URL}/inferno/classify",
-                    files=files,
+                # Uploaded once per backend, then referenced by handle
+                response = post_dataset(
+                    BACKEND_URL,
+                    "/inferno/classify",
+                    file,
+                    dataset_key,
                     data={"target": target},
                     headers=headers,
-                    timeout=60
+                    progress=upload_progress()
                 )
 
                 if response.status_code == 200:
@@ -148,14 +171,15 @@ elif mode == "Regression":
     file = st.file_uploader("Upload CSV", type=["csv"])
 
     if file:
-        # Load dataset locally for column inspection
-        df = pd.read_csv(file)
+        # Load dataset locally for column inspection (cached across reruns)
+        dataset_key, df = load_csv(file)
 
         st.subheader("Dataset Preview")
         st.dataframe(df.head(), use_container_width=True)
 
         # Filter numeric columns ONLY (regression-safe)
-        numeric_cols = df.select_dtypes(include=["number"]).columns.tolist()
+        columns = profile(dataset_key)
+        numeric_cols = columns.index[columns["kind"] == "numeric"].tolist()
 
         if len(numeric_cols) < 2:
             st.error("Dataset must contain at least 2 numeric columns for regression")
@@ -170,29 +194,24 @@ elif mode == "Regression":
 
         if st.button("Run Regression"):
             try:
-                files = {
-                    "file": (
-                        file.name,
-                        file.getvalue(),
-                        file.type
-                    )
-                }
-
-                response = requests.post(
-                    f"{BACKEND_URL}/inferno/regress",
-                    files=files,
+                # Uploaded once per backend, then referenced by handle
+                response = post_dataset(
+                    BACKEND_URL,
+                    "/inferno/regress",
+                    file,
+                    dataset_key,
                     data={"target": target},
                     headers=headers,
-                    timeout=60
+                    progress=upload_progress()
                 )
 
                 if response.status_code == 200:
                     result = response.json()
                     st.success("Regression completed")
 
-                    # ---- ALWAYS SHOW RAW RESULT ----
+                    # ---- ALWAYS SHOW RAW RESULT (long arrays summarised) ----
                     st.subheader("📦 Backend Output")
-                    st.json(result)
+                    st.json(compact(result))
 
                     # ---- SMART METRICS ----
                     if "r2" in result:
@@ -204,13 +223,30 @@ elif mode == "Regression":
                     if "mae" in result:
                         st.metric("MAE", result["mae"])
 
-                    if "predictions" in result:
-                        st.subheader("Sample Predictions")
-                        st.write(result["predictions"][:10])
+                    # ---- PREDICTIONS (binned/downsampled for any size) ----
+                    predicted = result.get("predictions", result.get("y_pred"))
+                    actual = next(
+                        (result[k] for k in ("y_true", "y_test", "actual")
+                         if k in result),
+                        None
+                    )
 
-                    if "y_pred" in result:
+                    if predicted:
                         st.subheader("Sample Predictions")
-                        st.write(result["y_pred"][:10])
+                        st.write(predicted[:10])
+
+                        if actual is not None and len(actual) == len(predicted):
+                            st.subheader("Predicted vs Actual")
+                            st.plotly_chart(
+                                pred_vs_actual_figure(actual, predicted),
+                                use_container_width=True
+                            )
+                        else:
+                            st.subheader("Prediction Distribution")
+                            st.plotly_chart(
+                                distribution_figure(predicted),
+                                use_container_width=True
+                            )
 
                 else:
                     st.error(f"Backend error: {response.status_code}")
@@ -228,13 +264,14 @@ elif mode == "Clustering":
 
     if file and st.button("Run Clustering"):
         try:
-            files = {"file": file}
-            response = requests.post(
-                f"{BACKEND_URL}/inferno/cluster",
-                files=files,
+            response = post_dataset(
+                BACKEND_URL,
+                "/inferno/cluster",
+                file,
+                key_for(file),
                 data={"k": k},
                 headers=headers,
-                timeout=60
+                progress=upload_progress()
             )
 
             st.json(response.json())
@@ -249,12 +286,13 @@ elif mode == "Association Rules":
 
     if file and st.button("Run Association Mining"):
         try:
-            files = {"file": file}
-            response = requests.post(
-                f"{BACKEND_URL}/inferno/associate",
-                files=files,
+            response = post_dataset(
+                BACKEND_URL,
+                "/inferno/associate",
+                file,
+                key_for(file),
                 headers=headers,
-                timeout=60
+                progress=upload_progress()
             )
 
             st.json(response.json())
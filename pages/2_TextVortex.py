@@ -1,7 +1,15 @@
 import streamlit as st
 import requests
 from wordcloud import WordCloud
-import matplotlib.pyplot as plt
+import asyncio
+import copy
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from core import corpus, http, nlp, scratch
+from core.datasets import content_key
 
 st.set_page_config(page_title="TextVortex", page_icon="🌪️", layout="wide")
 st.title("🌪️ TextVortex – NLP Intelligence Engine")
@@ -12,6 +20,95 @@ API_KEY = st.secrets["API_KEY"]
 
 headers = {"X-API-Key": API_KEY}
 
+endpoint_map = {
+    "Tokenization": "/text/tokenize",
+    "Stopwords Removal": "/text/stopwords",
+    "Stemming": "/text/stem",
+    "Lemmatization": "/text/lemmatize",
+    "N-Grams": "/text/ngrams",
+    "Keyword Extraction": "/text/keywords",
+    "Text Statistics": "/text/stats",
+    "Text Complexity": "/text/complexity"
+}
+
+mode = st.radio("Mode", ["Single Text", "Batch Corpus"], horizontal=True)
+
+# ---------------- BATCH CORPUS ---------------- #
+if mode == "Batch Corpus":
+    corpus_file = st.file_uploader(
+        "Upload a corpus (CSV or JSONL)", type=["csv", "jsonl", "ndjson"]
+    )
+    if not corpus_file:
+        st.stop()
+
+    sample = corpus.preview(corpus_file, corpus_file.name)
+    st.dataframe(sample, use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        text_column = st.selectbox("Text column", list(sample.columns))
+    with col2:
+        id_column = st.selectbox("ID column", ["(row number)", *sample.columns])
+
+    operations = st.multiselect(
+        "Operations",
+        list(endpoint_map),
+        default=["Tokenization", "Keyword Extraction", "Text Statistics", "Text Complexity"]
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        concurrency = st.slider("Concurrent requests", 1, http.POOL_MAXSIZE, corpus.DEFAULT_CONCURRENCY)
+    with col2:
+        output_format = st.radio("Output format", ["parquet", "jsonl"], horizontal=True)
+
+    # Results go to a scratch directory private to this browser session
+    st.session_state.text_batch_dir = scratch.session_dir(
+        "textvortex-", st.session_state.get("text_batch_dir")
+    )
+    output_path = st.session_state.text_batch_dir / f"{Path(corpus_file.name).stem}_results.{output_format}"
+
+    if operations and st.button("Run Batch"):
+        endpoints = [endpoint_map[op] for op in operations]
+        documents = corpus.read_documents(
+            corpus_file,
+            corpus_file.name,
+            text_column,
+            id_column=None if id_column == "(row number)" else id_column
+        )
+
+        col1, col2, col3 = st.columns(3)
+        done_metric, rate_metric, error_metric = col1.empty(), col2.empty(), col3.empty()
+        failed = 0
+        started = time.perf_counter()
+
+        # Rows are written as each batch completes, so memory stays flat
+        with corpus.ResultWriter(output_path, [corpus.column_name(e) for e in endpoints]) as writer:
+            for records in corpus.analyze_corpus(
+                BACKEND_URL, endpoints, documents,
+                headers=headers, concurrency=concurrency
+            ):
+                writer.write(records)
+                failed += sum(r["errors"] is not None for r in records)
+
+                elapsed = time.perf_counter() - started
+                done_metric.metric("Documents", writer.rows)
+                rate_metric.metric("Docs / sec", f"{writer.rows / elapsed:.1f}")
+                error_metric.metric("With errors", failed)
+
+        st.success(
+            f"Analyzed {writer.rows} documents in "
+            f"{time.perf_counter() - started:.1f} s"
+        )
+        st.download_button(
+            "Download results",
+            output_path.read_bytes,
+            file_name=output_path.name,
+            on_click="ignore"
+        )
+
+    st.stop()
+
 # ---------------- UI ---------------- #
 text = st.text_area("Enter text for analysis", height=200)
 
@@ -26,85 +123,194 @@ operation = st.selectbox(
         "Keyword Extraction",
         "Text Statistics",
         "Text Complexity",
-        "Word Cloud"   # ✅ ADDED
+        "Word Cloud",   # ✅ ADDED
+        "Full Analysis"
     ]
 )
 
+if operation == "Word Cloud":
+    col1, col2 = st.columns(2)
+    with col1:
+        colormap = st.selectbox("Colours", ["viridis", "plasma", "magma", "cividis", "tab10", "Set2", "Dark2"])
+    with col2:
+        background = st.color_picker("Background", "#FFFFFF")
+
+engine = st.radio(
+    "Engine",
+    ["Auto", "Local", "Backend"],
+    horizontal=True,
+    help="Auto uses the backend, falling back to the local engine when it is slow or unreachable"
+)
+
+# ---------------- LOCAL FALLBACK ---------------- #
+AUTO_TIMEOUT = (3, 8)       # backend gets this long in Auto mode
+BACKEND_COOLDOWN = 60       # seconds to skip a failed backend in Auto mode
+
+
+def backend_enabled():
+    if engine == "Local":
+        return False
+    return engine == "Backend" or time.time() >= st.session_state.get("text_backend_down", 0)
+
+
+def fetch(endpoint, text):
+    """Backend call only (no Streamlit calls), so it can run on any thread."""
+    try:
+        return http.post(
+            BACKEND_URL,
+            endpoint,
+            json={"text": text},
+            headers=headers,
+            timeout=AUTO_TIMEOUT if engine == "Auto" else None,
+            # Auto falls back locally instead of waiting out retries
+            retries=engine != "Auto"
+        )
+    except requests.exceptions.RequestException as e:
+        return e
+
+
+def settle(endpoint, text, analysis, outcome):
+    """Turn a backend response (or failure) into ``(json, source)``.
+
+    Raises ``requests.HTTPError`` for backend rejections (and, in Backend
+    mode, any failure) so callers report them as before.
+    """
+    if outcome is None:
+        source = "local engine" if engine == "Local" else "local engine (backend unavailable)"
+        return nlp.run_local(endpoint, text, analysis), source
+
+    failed = isinstance(outcome, requests.exceptions.RequestException) or (
+        engine == "Auto" and outcome.status_code >= 500
+    )
+    if failed and engine == "Auto":
+        st.session_state["text_backend_down"] = time.time() + BACKEND_COOLDOWN
+        return nlp.run_local(endpoint, text, analysis), "local engine (backend slow or unreachable)"
+    if isinstance(outcome, Exception):
+        raise outcome
+
+    outcome.raise_for_status()
+    return outcome.json(), "backend"
+
+
+def run_text(endpoint, text, analysis):
+    outcome = fetch(endpoint, text) if backend_enabled() else None
+    return settle(endpoint, text, analysis, outcome)
+
+
+async def fan_out(text, analysis, sections):
+    """Fire every operation at once; render each section as it lands."""
+    loop = asyncio.get_running_loop()
+    use_backend = backend_enabled()
+
+    async def call(name):
+        if not use_backend:
+            return name, None
+        # The pooled session keeps these on warm keep-alive connections
+        return name, await loop.run_in_executor(executor, fetch, endpoint_map[name], text)
+
+    with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+        for next_done in asyncio.as_completed([call(name) for name in sections]):
+            name, outcome = await next_done
+            with sections[name].container():
+                st.subheader(name)
+                try:
+                    result, source = settle(endpoint_map[name], text, analysis, outcome)
+                    st.caption(f"Computed by the {source}")
+                    st.json(result, expanded=False)
+                except (requests.exceptions.RequestException, LookupError) as e:
+                    report_error(e)
+
+
+# ---------------- WORD CLOUD RENDERING ---------------- #
+CLOUD_SIZE = (800, 400)
+
+
+@st.cache_resource(max_entries=32)
+def cloud_layout(freq_key, _keywords):
+    """Word placement for a frequency table; the expensive part, done once."""
+    width, height = CLOUD_SIZE
+    return WordCloud(width=width, height=height, random_state=0).generate_from_frequencies(_keywords)
+
+
+@st.cache_data(max_entries=64)
+def render_cloud(freq_key, _keywords, colormap, background):
+    """RGB array of a cloud; colour changes reuse the cached layout."""
+    wc = copy.copy(cloud_layout(freq_key, _keywords))
+    wc.background_color = background
+    wc.recolor(colormap=colormap, random_state=0)
+    return wc.to_array()
+
+
+def report_error(e):
+    if isinstance(e, requests.exceptions.HTTPError):
+        st.error(f"Backend error: {e.response.status_code}")
+        st.text(e.response.text)
+    elif isinstance(e, LookupError):
+        st.error(str(e))
+    else:
+        st.error("Could not connect to TextVortex backend")
+        st.text(str(e))
+
+
 # ---------------- ACTION ---------------- #
 if st.button("Run TextVortex"):
     if not text.strip():
         st.warning("Please enter text")
         st.stop()
 
-    # -------- WORD CLOUD (FRONTEND VISUALIZATION) -------- #
-    if operation == "Word Cloud":
-        try:
-            response = requests.post(
-                f"{BACKEND_URL}/text/keywords",
-                json={"text": text},
-                headers=headers,
-                timeout=60
-            )
+    # One tokenization pass shared by whatever runs locally
+    analysis = nlp.Analysis(text)
 
-            if response.status_code == 200:
-                keywords = response.json().get("keywords", {})
+    # -------- FULL ANALYSIS (EVERY OPERATION AT ONCE) -------- #
+    if operation == "Full Analysis":
+        started = time.perf_counter()
+        sections = {name: st.empty() for name in endpoint_map}
+        for name, section in sections.items():
+            section.caption(f"⏳ {name}...")
 
-                if not keywords:
-                    st.warning("No keywords returned")
-                    st.stop()
+        asyncio.run(fan_out(text, analysis, sections))
+        st.success(f"Full analysis completed in {time.perf_counter() - started:.2f} s")
 
-                wc = WordCloud(
-                    width=800,
-                    height=400,
-                    background_color="white"
-                ).generate_from_frequencies(keywords)
-
-                fig, ax = plt.subplots(figsize=(10, 5))
-                ax.imshow(wc, interpolation="bilinear")
-                ax.axis("off")
+    # -------- WORD CLOUD (FRONTEND VISUALIZATION) -------- #
+    elif operation == "Word Cloud":
+        st.session_state.pop("word_cloud", None)
+        try:
+            result, source = run_text("/text/keywords", text, analysis)
+            keywords = result.get("keywords", {})
 
-                st.success("Word Cloud generated")
-                st.pyplot(fig)
+            if not keywords:
+                st.warning("No keywords returned")
+                st.stop()
 
-            else:
-                st.error(f"Backend error: {response.status_code}")
-                st.text(response.text)
+            st.session_state["word_cloud"] = {
+                "key": content_key(json.dumps(sorted(keywords.items())).encode()),
+                "keywords": keywords,
+                "source": source
+            }
 
-        except requests.exceptions.RequestException as e:
-            st.error("Could not connect to TextVortex backend")
-            st.text(str(e))
+        except (requests.exceptions.RequestException, LookupError) as e:
+            report_error(e)
 
     # -------- ALL OTHER NLP OPERATIONS -------- #
     else:
-        endpoint_map = {
-            "Tokenization": "/text/tokenize",
-            "Stopwords Removal": "/text/stopwords",
-            "Stemming": "/text/stem",
-            "Lemmatization": "/text/lemmatize",
-            "N-Grams": "/text/ngrams",
-            "Keyword Extraction": "/text/keywords",
-            "Text Statistics": "/text/stats",
-            "Text Complexity": "/text/complexity"
-        }
-
         endpoint = endpoint_map[operation]
 
         try:
-            response = requests.post(
-                f"{BACKEND_URL}{endpoint}",
-                json={"text": text},
-                headers=headers,
-                timeout=60
-            )
-
-            if response.status_code == 200:
-                st.success("TextVortex processing completed")
-                st.json(response.json())
-            else:
-                st.error(f"Backend error: {response.status_code}")
-                st.text(response.text)
-
-        except requests.exceptions.RequestException as e:
-            st.error("Could not connect to TextVortex backend")
-            st.text(str(e))
+            result, source = run_text(endpoint, text, analysis)
+            st.success("TextVortex processing completed")
+            st.caption(f"Computed by the {source}")
+            st.json(result)
+
+        except (requests.exceptions.RequestException, LookupError) as e:
+            report_error(e)
+
+# Kept across reruns, so changing colours re-renders without a new request
+cloud = st.session_state.get("word_cloud")
 
+if operation == "Word Cloud" and cloud:
+    st.success("Word Cloud generated")
+    st.caption(f"Keywords from the {cloud['source']}")
+    st.image(
+        render_cloud(cloud["key"], cloud["keywords"], colormap, background),
+        use_container_width=True
+    )
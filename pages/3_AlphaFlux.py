@@ -1,8 +1,14 @@
 import streamlit as st
 import numpy as np
 import pandas as pd
+import re
+import time
 from datetime import date, timedelta
-from sklearn.linear_model import LinearRegression
+
+from core.backtest import backtest_windows
+from core.forecast import trend_forecast, trend_signals
+from core.plotting import line_figure
+from core.prices import PriceStore, synthetic_fetcher, yahoo_fetcher
 
 # ---------------- PAGE CONFIG ---------------- #
 st.set_page_config(
@@ -14,8 +20,59 @@ st.set_page_config(
 st.title("📈 AlphaFlux – Stock Forecasting Engine (Standalone)")
 st.caption("Local forecasting demo without backend dependency")
 
+FETCHERS = {
+    "Synthetic (offline)": synthetic_fetcher,
+    "Yahoo Finance": yahoo_fetcher
+}
+
+
+# ---------------- PRICE STORE ---------------- #
+# History is kept on disk per symbol; only missing ranges are fetched
+@st.cache_resource
+def price_store(source):
+    return PriceStore(FETCHERS[source])
+
+
+def load_prices(source, symbols, start, end):
+    """Aligned (date x symbol) close prices; symbols without data are dropped."""
+    store = price_store(source)
+    frame = pd.concat(
+        {s: store.history(s, start, end) for s in symbols}, axis=1
+    )
+    return frame.dropna(axis=1, how="all").ffill().dropna()
+
+
+def zoomable_chart(series, key):
+    """Line chart re-sampled to screen resolution for the selected range."""
+    first = min(s.index[0] for s in series.values()).date()
+    last = max(s.index[-1] for s in series.values()).date()
+
+    visible = st.slider(
+        "Visible range", first, last, (first, last),
+        format="YYYY-MM-DD", key=key
+    )
+    st.plotly_chart(
+        line_figure(
+            series,
+            x_range=(pd.Timestamp(visible[0]), pd.Timestamp(visible[1]))
+        ),
+        use_container_width=True
+    )
+
 # ---------------- USER INPUT ---------------- #
-symbol = st.text_input("Stock Symbol", "AAPL")
+mode = st.radio("Mode", ["Single Symbol", "Watchlist"], horizontal=True)
+source = st.selectbox("Price Source", list(FETCHERS))
+
+if mode == "Single Symbol":
+    symbol = st.text_input("Stock Symbol", "AAPL")
+else:
+    watchlist = st.text_area(
+        "Watchlist (comma or newline separated)",
+        "AAPL, MSFT, GOOG, AMZN, TSLA, NVDA, META, NFLX"
+    )
+    symbols = list(dict.fromkeys(
+        s.upper() for s in re.split(r"[,\s]+", watchlist) if s
+    ))
 
 col1, col2 = st.columns(2)
 with col1:
@@ -25,71 +82,183 @@ with col2:
 
 horizon = st.slider("Forecast Horizon (days)", 5, 60, 15)
 
-# ---------------- RUN FORECAST ---------------- #
-if st.button("Run Forecast"):
+if mode == "Single Symbol":
+    run_backtest = st.checkbox("Walk-forward backtest of the signal")
+    if run_backtest:
+        windows = st.multiselect(
+            "Rolling windows (trading days)",
+            [20, 40, 60, 90, 120, 180, 250],
+            default=[20, 60, 120, 250]
+        )
 
-    # --------- SYNTHETIC HISTORICAL DATA --------- #
-    days = (end_date - start_date).days
-    dates = [start_date + timedelta(days=i) for i in range(days)]
+# ---------------- RUN FORECAST ---------------- #
+if mode == "Single Symbol" and st.button("Run Forecast"):
 
-    prices = np.cumsum(np.random.randn(days)) + 150
+    # --------- HISTORICAL DATA --------- #
+    history = load_prices(source, [symbol.upper()], start_date, end_date)
+    if history.empty:
+        st.error(f"No price history found for {symbol}")
+        st.stop()
 
-    hist_df = pd.DataFrame({
-        "date": dates,
-        "price": prices
-    })
+    dates = history.index
+    prices = history.iloc[:, 0].to_numpy()
 
     # --------- MODEL --------- #
-    X = np.arange(len(prices)).reshape(-1, 1)
-    y = prices
+    # Closed-form least-squares trend (same solve as the watchlist mode)
+    forecast, _ = trend_forecast(prices, horizon)
 
-    model = LinearRegression()
-    model.fit(X, y)
+    future_dates = pd.bdate_range(
+        dates[-1] + timedelta(days=1), periods=horizon
+    )
 
-    future_X = np.arange(len(prices), len(prices) + horizon).reshape(-1, 1)
-    future_prices = model.predict(future_X)
+    # --------- METRICS --------- #
+    buy, conf, recent, future = trend_signals(prices, forecast)
 
-    future_dates = [
-        dates[-1] + timedelta(days=i + 1)
-        for i in range(horizon)
-    ]
+    # ---------------- BACKTEST ---------------- #
+    # Signal re-derived at every date from rolling running-sum fits
+    backtest = None
+    if run_backtest and windows:
+        started = time.perf_counter()
+        summary, equity = backtest_windows(
+            prices, sorted(windows), horizon, dates=dates
+        )
+        backtest = {
+            "summary": summary,
+            "equity": equity,
+            "windows": len(windows),
+            "elapsed": time.perf_counter() - started
+        }
 
-    fore_df = pd.DataFrame({
-        "date": future_dates,
-        "price": future_prices
-    })
+    # Kept across reruns so zooming the charts doesn't reset it
+    st.session_state["forecast_run"] = {
+        "source": source,
+        "signal": "BUY 📈" if buy[0] else "SELL 📉",
+        "confidence": round(float(conf[0]), 3),
+        "recent_avg": float(recent[0]),
+        "future_avg": float(future[0]),
+        "history": pd.Series(prices, index=dates),
+        "forecast": pd.Series(forecast[0], index=future_dates),
+        "backtest": backtest
+    }
 
-    # --------- METRICS --------- #
-    recent_avg = float(np.mean(y[-10:]))
-    future_avg = float(np.mean(future_prices))
+run = st.session_state.get("forecast_run")
 
-    signal = "BUY 📈" if future_avg > recent_avg else "SELL 📉"
-    confidence = round(abs(future_avg - recent_avg) / max(recent_avg, 1), 3)
+if mode == "Single Symbol" and run:
 
     # ---------------- DISPLAY ---------------- #
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Signal", signal)
-    col2.metric("Confidence", confidence)
-    col3.metric("Recent Avg Price", round(recent_avg, 2))
-    col4.metric("Future Avg Price", round(future_avg, 2))
+    col1.metric("Signal", run["signal"])
+    col2.metric("Confidence", run["confidence"])
+    col3.metric("Recent Avg Price", round(run["recent_avg"], 2))
+    col4.metric("Future Avg Price", round(run["future_avg"], 2))
 
     st.subheader("📊 Price Forecast Graph")
+    zoomable_chart(
+        {"Historical": run["history"], "Forecast": run["forecast"]},
+        key="forecast_zoom"
+    )
 
-    chart_df = pd.concat([
-        hist_df.assign(type="Historical"),
-        fore_df.assign(type="Forecast")
-    ])
+    st.caption(
+        f"{len(run['history'])} trading days from the local "
+        f"{run['source']} store"
+    )
 
-    chart_df = chart_df.set_index("date")
+    backtest = run["backtest"]
+    if backtest:
+        st.subheader("🧪 Walk-Forward Backtest")
+        st.caption(
+            f"{backtest['windows']} window(s) over {len(run['history'])} days "
+            f"in {backtest['elapsed'] * 1000:.1f} ms"
+        )
+        st.dataframe(
+            backtest["summary"].style.format({
+                "Hit Rate": "{:.1%}",
+                "Total Return": "{:.1%}",
+                "Buy & Hold": "{:.1%}",
+                "Max Drawdown": "{:.1%}",
+                "Sharpe": "{:.2f}"
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+        zoomable_chart(
+            dict(backtest["equity"].items()), key="equity_zoom"
+        )
 
-    st.line_chart(
-        {
-            "Historical": hist_df.set_index("date")["price"],
-            "Forecast": fore_df.set_index("date")["price"]
-        }
+# ---------------- WATCHLIST FORECAST ---------------- #
+if mode == "Watchlist" and st.button("Run Watchlist Forecast"):
+
+    if not symbols:
+        st.warning("Please enter at least one symbol")
+        st.stop()
+
+    # --------- HISTORICAL DATA --------- #
+    # One row per symbol: (n_symbols, n_days) price matrix
+    history = load_prices(source, symbols, start_date, end_date)
+    missing = [s for s in symbols if s not in history.columns]
+    if missing:
+        st.warning(f"No price history for: {', '.join(missing)}")
+    if history.empty:
+        st.stop()
+
+    symbols = list(history.columns)
+    dates = history.index
+    prices = history.to_numpy().T
+
+    started = time.perf_counter()
+
+    # --------- MODEL --------- #
+    # Every symbol's trend in one vectorized least-squares solve
+    forecast, slopes = trend_forecast(prices, horizon)
+    buy, conf, recent, future = trend_signals(prices, forecast)
+
+    # Kept across reruns so the symbol picker below doesn't reset it
+    st.session_state["watchlist_run"] = {
+        "symbols": symbols,
+        "dates": dates,
+        "prices": prices,
+        "forecast": forecast,
+        "buy": buy,
+        "elapsed": time.perf_counter() - started,
+        "results": pd.DataFrame({
+            "Symbol": symbols,
+            "Signal": np.where(buy, "BUY 📈", "SELL 📉"),
+            "Confidence": conf.round(3),
+            "Recent Avg Price": recent.round(2),
+            "Future Avg Price": future.round(2),
+            "Trend / Day": slopes.round(4)
+        })
+    }
+
+run = st.session_state.get("watchlist_run")
+
+if mode == "Watchlist" and run:
+
+    # ---------------- DISPLAY ---------------- #
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Symbols", len(run["symbols"]))
+    col2.metric("BUY Signals", int(run["buy"].sum()))
+    col3.metric("Forecast Time", f"{run['elapsed'] * 1000:.1f} ms")
+
+    st.subheader("📋 Watchlist Signals")
+    st.dataframe(run["results"], use_container_width=True, hide_index=True)
+
+    st.subheader("📊 Forecast Graph")
+    pick = st.selectbox("Symbol", run["symbols"])
+    row = run["symbols"].index(pick)
+
+    dates = run["dates"]
+    future_dates = pd.bdate_range(
+        dates[-1] + timedelta(days=1),
+        periods=run["forecast"].shape[1]
     )
 
-    st.info(
-        "⚠️ This is a standalone demo using synthetic data. "
-        "Backend integration can be enabled later."
+    zoomable_chart(
+        {
+            "Historical": pd.Series(run["prices"][row], index=dates),
+            "Forecast": pd.Series(run["forecast"][row], index=future_dates)
+        },
+        key="watchlist_zoom"
     )
+
+    st.caption(f"Prices from the local {source} store")
@@ -2,6 +2,14 @@ import streamlit as st
 import requests
 from PIL import Image
 import io
+import os
+import shutil
+import time
+from pathlib import Path
+
+from core import scratch, vision
+from core.datasets import key_for
+from core.uploads import post_file
 
 st.set_page_config(page_title="VisionBlaze", page_icon="📷", layout="wide")
 st.title("📷 VisionBlaze – Computer Vision Engine")
@@ -11,10 +19,7 @@ BACKEND_URL = st.secrets["BACKEND_URL"]
 API_KEY = st.secrets["API_KEY"]
 
 # ---------------- UI ---------------- #
-uploaded_file = st.file_uploader(
-    "Upload an image",
-    type=["png", "jpg", "jpeg"]
-)
+mode = st.radio("Mode", ["Single Image", "Batch"], horizontal=True)
 
 operation = st.selectbox(
     "Select Vision Operation",
@@ -26,57 +31,279 @@ operation = st.selectbox(
     ]
 )
 
+execution = st.radio(
+    "Execution",
+    ["Auto", "Local", "Backend"],
+    horizontal=True,
+    help="Auto runs in-process or on the backend, whichever has been faster for this image size"
+)
+
+# ---------------- OPERATION SETTINGS ---------------- #
+params = {}
+endpoint = ""
+
+if operation == "Edge Detection":
+    t1 = st.slider("Lower Threshold", 0, 255, 80)
+    t2 = st.slider("Upper Threshold", 0, 255, 180)
+    params = {"t1": t1, "t2": t2}
+    endpoint = "/vision/edges"
+
+elif operation == "Contrast Enhancement":
+    endpoint = "/vision/contrast"
+
+elif operation == "Saliency Mapping":
+    endpoint = "/vision/saliency"
+
+elif operation == "Segmentation":
+    endpoint = "/vision/segment"
+
+
+# ---------------- LOCAL ENGINE ---------------- #
+def decoded(image_key, data, side=None):
+    """Decoded upload (or its preview proxy), kept in the result cache."""
+    def load():
+        image = vision.decode(data)
+        return vision.downscale(image, side) if side else image
+
+    return vision.results.cached(
+        vision.results.key(image_key, "decode", side=side), load
+    )
+
+
+def run_local(image, endpoint, params):
+    started = time.perf_counter()
+    output = vision.run_local(endpoint, image, params)
+    vision.planner.record(
+        endpoint, "local", vision.megapixels(image), time.perf_counter() - started
+    )
+    return output
+
+
+def show_result(result, caption):
+    st.image(
+        result,
+        channels="BGR" if result.ndim == 3 else "RGB",
+        caption=caption,
+        use_container_width=True
+    )
+
+
+# ---------------- SINGLE IMAGE ---------------- #
+uploaded_file = None
+if mode == "Single Image":
+    uploaded_file = st.file_uploader(
+        "Upload an image",
+        type=["png", "jpg", "jpeg"]
+    )
+
 if uploaded_file:
     st.image(uploaded_file, caption="Original Image", use_container_width=True)
 
-    params = {}
-    endpoint = ""
+    live = st.checkbox(
+        "Live preview",
+        value=True,
+        help=f"Tune on a copy at most {vision.PREVIEW_SIDE}px wide, then process the full image"
+    )
 
-    # ---------------- OPERATION SETTINGS ---------------- #
-    if operation == "Edge Detection":
-        t1 = st.slider("Lower Threshold", 0, 255, 80)
-        t2 = st.slider("Upper Threshold", 0, 255, 180)
-        params = {"t1": t1, "t2": t2}
-        endpoint = "/vision/edges"
+    # ---------------- UPLOAD SETTINGS ---------------- #
+    with st.expander("Upload settings"):
+        working_side = st.select_slider(
+            "Max working resolution (longest side, px)",
+            [1024, 2048, 4096, 8192],
+            value=vision.WORKING_SIDE
+        )
+        fmt = st.radio("Upload format", ["webp", "jpeg", "png"], horizontal=True)
+        quality = st.slider(
+            "Quality", 50, 100, vision.UPLOAD_QUALITY, disabled=fmt == "png"
+        )
+        tile_workers = st.slider("Concurrent tile uploads", 1, 8, 4)
 
-    elif operation == "Contrast Enhancement":
-        endpoint = "/vision/contrast"
+    # ---------------- EXECUTION ---------------- #
+    data = uploaded_file.getvalue()
+    image_key = key_for(uploaded_file)      # hashed once per upload
+    width, height = Image.open(io.BytesIO(data)).size   # header only
+    scale = min(1.0, working_side / max(width, height))
+    image_mp = width * height * scale ** 2 / 1e6
 
-    elif operation == "Saliency Mapping":
-        endpoint = "/vision/saliency"
+    backend = {"Local": "local", "Backend": "remote"}.get(
+        execution, vision.planner.choose(endpoint, image_mp)
+    )
 
-    elif operation == "Segmentation":
-        endpoint = "/vision/segment"
+    # Every (image, operation, params) result is cached per engine, so
+    # Local never shows a backend result and vice versa; backend results
+    # also depend on how the upload was encoded
+    def result_key(target, side=working_side):
+        upload = None
+        if target == "remote":
+            upload = (fmt, None if fmt == "png" else quality)
+        return vision.results.key(
+            image_key, endpoint, params, side=side, target=target, upload=upload
+        )
 
-    # ---------------- EXECUTION ---------------- #
-    if st.button("Run VisionBlaze"):
+    full_key = result_key(backend)
+    result = vision.results.get(full_key)
+
+    if result is not None:
+        show_result(result, "Processed Output (cached)")
+
+    elif live:
+        proxy = decoded(image_key, data, side=vision.PREVIEW_SIDE)
+        preview = vision.results.cached(
+            result_key("local", side=vision.PREVIEW_SIDE),
+            lambda: run_local(proxy, endpoint, params)
+        )
+        show_result(
+            preview,
+            f"Live preview ({proxy.shape[1]}×{proxy.shape[0]} of {width}×{height})"
+        )
+        confirm = st.button("Process full resolution")
+
+    # Local runs re-render on every slider change, no button needed
+    else:
+        confirm = backend == "local" or st.button("Run VisionBlaze")
+
+    if result is None and confirm and backend == "local":
+        with st.spinner("Processing image..."):
+            result = run_local(
+                decoded(image_key, data, side=working_side), endpoint, params
+            )
+        vision.results.put(full_key, result)
+        show_result(result, "Processed Output (local)")
+
+    elif result is None and confirm:
         with st.spinner("Processing image..."):
+            image = decoded(image_key, data, side=working_side)
             try:
-                files = {
-                    "file": (
-                        uploaded_file.name,
-                        uploaded_file.getvalue(),
-                        uploaded_file.type
-                    )
-                }
+                started = time.perf_counter()
+                upload_bar = st.progress(0.0, text="Uploading image")
 
-                response = requests.post(
-                    f"{BACKEND_URL}{endpoint}",
-                    files=files,
-                    data=params,
+                # Downscaled and re-encoded before upload; large images
+                # for edge detection go up as overlapping tiles in parallel
+                result = vision.process_remote(
+                    BACKEND_URL,
+                    endpoint,
+                    image,
+                    params=params,
                     headers={"X-API-Key": API_KEY},
-                    timeout=60   # 🔥 REQUIRED
+                    fmt=fmt,
+                    quality=quality,
+                    max_workers=tile_workers,
+                    progress=lambda done, total: upload_bar.progress(
+                        done / total, text=f"Processed {done} / {total} part(s)"
+                    )
                 )
+                upload_bar.empty()
 
-                if response.status_code == 200:
-                    img = Image.open(io.BytesIO(response.content))
-                    st.success("Processing completed")
-                    st.image(img, caption="Processed Output", use_container_width=True)
-                else:
-                    st.error(f"Backend error: {response.status_code}")
-                    st.text(response.text)
+                vision.planner.record(
+                    endpoint, "remote", vision.megapixels(image),
+                    time.perf_counter() - started
+                )
+                vision.results.put(full_key, result)
+                st.success("Processing completed")
+                show_result(result, f"Processed Output ({image.shape[1]}×{image.shape[0]})")
+
+            except requests.exceptions.HTTPError as e:
+                st.error(f"Backend error: {e.response.status_code}")
+                st.text(e.response.text)
 
             except requests.exceptions.RequestException as e:
-                st.error("Could not connect to VisionBlaze backend")
-                st.text(str(e))
+                if execution == "Auto":
+                    vision.planner.record_failure(endpoint, "remote")
+                    st.warning("Backend unreachable, processed locally instead")
+                    result = run_local(image, endpoint, params)
+                    vision.results.put(result_key("local"), result)
+                    show_result(result, "Processed Output (local)")
+                else:
+                    st.error("Could not connect to VisionBlaze backend")
+                    st.text(str(e))
+
+# ---------------- BATCH ---------------- #
+def session_dir():
+    """Scratch directory private to this browser session."""
+    st.session_state.vision_batch_dir = scratch.session_dir(
+        "visionblaze-", st.session_state.get("vision_batch_dir")
+    )
+    return st.session_state.vision_batch_dir
+
+
+if mode == "Batch":
+    uploads = st.file_uploader(
+        "Upload images or zips of images",
+        type=["png", "jpg", "jpeg", "bmp", "tif", "tiff", "webp", "zip"],
+        accept_multiple_files=True
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        cores = os.cpu_count() or 1
+        workers = st.slider("Local worker processes", 1, max(cores, 2), cores)
+    with col2:
+        concurrency = st.slider("Max concurrent backend calls", 1, 16, 4)
+
+    if uploads and st.button("Run Batch"):
+        # Inputs and outputs live in this session's own scratch directory
+        source = vision.stage_uploads(uploads, session_dir() / "input")
+        out_dir = session_dir() / "output"
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+        names = vision.list_images(source)
+        if not names:
+            st.warning("No images found")
+            st.stop()
+
+        # Auto uses the local process pool; Backend fans out capped calls
+        if execution == "Backend":
+            def remote(name, data):
+                response = post_file(
+                    BACKEND_URL, endpoint, io.BytesIO(data), Path(name).name,
+                    vision.mimetype(name), data=params,
+                    headers={"X-API-Key": API_KEY}
+                )
+                response.raise_for_status()
+                return response.content
+        else:
+            remote = None
+
+        bar = st.progress(0.0, text="Starting batch")
+        stats = st.empty()
+        failures = []
+        written = []
+        done = total_bytes = 0
+        started = time.perf_counter()
+
+        # Results are written to out_dir as each image finishes
+        for name, size, error in vision.run_batch(
+            source, endpoint, out_dir, params=params, remote=remote,
+            max_workers=concurrency if remote else workers, names=names
+        ):
+            done += 1
+            total_bytes += size
+            if error is None:
+                written.append(name)
+            else:
+                failures.append({"Image": name, "Error": str(error)})
+
+            elapsed = time.perf_counter() - started
+            bar.progress(done / len(names), text=f"{done} / {len(names)}: {name}")
+            stats.caption(
+                f"{done / elapsed:.1f} images/s · "
+                f"{total_bytes / 1e6 / elapsed:.1f} MB/s · "
+                f"{len(failures)} failed"
+            )
+
+        st.success(
+            f"Processed {len(written)} of {len(names)} images "
+            f"in {time.perf_counter() - started:.1f} s"
+        )
+        if failures:
+            st.dataframe(failures, use_container_width=True)
 
+        # The zip is built on disk and only read once it is downloaded
+        bundle = vision.zip_results(
+            out_dir, written, session_dir() / "visionblaze_results.zip"
+        )
+        st.download_button(
+            "Download results (zip)", bundle.read_bytes,
+            file_name="visionblaze_results.zip", mime="application/zip",
+            on_click="ignore"
+        )
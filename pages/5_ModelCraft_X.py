@@ -1,16 +1,20 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import time
 
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.pipeline import Pipeline
 from sklearn.metrics import accuracy_score, r2_score
 
 from sklearn.linear_model import LogisticRegression, LinearRegression
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
 from sklearn.svm import SVC, SVR
 
+from core.datasets import load_csv, profile
+from core.modelcraft import (
+    run_zoo, default_workers, prepare_xy, build_folds,
+    successive_halving, PARAM_GRIDS
+)
+
 # ---------------- STREAMLIT CONFIG ---------------- #
 st.set_page_config(
     page_title="ModelCraft-X",
@@ -20,92 +24,189 @@ st.set_page_config(
 
 st.title("🧬 ModelCraft-X – AutoML Benchmarking Engine")
 
+
+# ---------------- CACHED PREPROCESSING ---------------- #
+# Encoding, fold splits and per-fold scaling are computed once per
+# (dataset, target, CV setting) and shared by every model and rerun.
+# Frames are keyed by their content hash instead of being re-hashed.
+@st.cache_resource(max_entries=4, show_spinner=False)
+def load_xy(_df, dataset_key, target):
+    return prepare_xy(_df, target, columns=profile(dataset_key))
+
+
+@st.cache_resource(max_entries=8, show_spinner="Building folds...")
+def load_folds(_df, dataset_key, target, n_splits, n_repeats):
+    X, y, task_type = load_xy(_df, dataset_key, target)
+    return build_folds(X, y, task_type, n_splits=n_splits, n_repeats=n_repeats)
+
+
+def model_zoo(task_type):
+    if task_type == "classification":
+        models = {
+            "Logistic Regression": LogisticRegression(max_iter=1000),
+            "Random Forest": RandomForestClassifier(),
+            "SVM": SVC()
+        }
+        return models, "Accuracy", accuracy_score
+
+    models = {
+        "Linear Regression": LinearRegression(),
+        "Random Forest Regressor": RandomForestRegressor(),
+        "SVR": SVR()
+    }
+    return models, "R² Score", r2_score
+
+
 # ---------------- DATA UPLOAD ---------------- #
 uploaded_file = st.file_uploader("Upload CSV Dataset", type=["csv"])
 
 if uploaded_file:
-    df = pd.read_csv(uploaded_file)
+    dataset_key, df = load_csv(uploaded_file)
     st.success("Dataset loaded successfully")
     st.dataframe(df.head(), use_container_width=True)
 
     target = st.selectbox("Select Target Column", df.columns)
 
-    if st.button("Run ModelCraft-X Benchmark"):
-
-        with st.spinner("Running AutoML benchmarking locally..."):
-
-            data = df.copy()
-
-            # ---------------- PREPROCESSING ---------------- #
-            X = data.drop(columns=[target])
-            y = data[target]
+    _, _, task_type = load_xy(df, dataset_key, target)
+    models, metric_name, scorer = model_zoo(task_type)
+
+    selected = st.multiselect(
+        "Models to benchmark", list(models), default=list(models)
+    )
+
+    # ---------------- EVALUATION SETTINGS ---------------- #
+    evaluation = st.radio(
+        "Evaluation", ["Hold-out (80/20)", "K-Fold CV"], horizontal=True
+    )
+
+    n_splits, n_repeats = 1, 1
+    if evaluation == "K-Fold CV":
+        col1, col2 = st.columns(2)
+        with col1:
+            n_splits = st.slider("Folds (k)", 2, 10, 5)
+        with col2:
+            n_repeats = st.slider("Repeats", 1, 5, 1)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        # A single-CPU machine has nothing to choose
+        n_workers = 1
+        if default_workers() > 1:
+            n_workers = st.slider(
+                "Parallel workers", 1, default_workers(), min(3, default_workers())
+            )
+    with col2:
+        budget = st.number_input(
+            "Per-model time budget (s)", min_value=1, max_value=3600, value=120
+        )
 
-            # Encode categorical features
-            for col in X.select_dtypes(include=["object"]).columns:
-                X[col] = LabelEncoder().fit_transform(X[col])
+    tune = st.checkbox("Tune hyperparameters (successive halving)")
+    if tune:
+        search_budget = st.number_input(
+            "Search time budget (s)", min_value=10, max_value=7200, value=120
+        )
 
-            # Detect problem type
-            task_type = "classification" if y.nunique() <= 20 else "regression"
+    if st.button("Run ModelCraft-X Benchmark"):
 
-            if task_type == "classification" and y.dtype == "object":
-                y = LabelEncoder().fit_transform(y)
+        if not selected:
+            st.warning("Select at least one model")
+            st.stop()
 
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42
-            )
+        with st.spinner("Running AutoML benchmarking locally..."):
 
-            # ---------------- MODEL ZOO ---------------- #
-            if task_type == "classification":
-                models = {
-                    "Logistic Regression": LogisticRegression(max_iter=1000),
-                    "Random Forest": RandomForestClassifier(),
-                    "SVM": SVC()
-                }
-                metric_name = "Accuracy"
-                scorer = accuracy_score
-
-            else:
-                models = {
-                    "Linear Regression": LinearRegression(),
-                    "Random Forest Regressor": RandomForestRegressor(),
-                    "SVR": SVR()
-                }
-                metric_name = "R² Score"
-                scorer = r2_score
+            # ---------------- PREPROCESSING ---------------- #
+            # Reused across reruns and model subsets
+            folds = load_folds(df, dataset_key, target, n_splits, n_repeats)
+
+            zoo = {name: models[name] for name in selected}
+
+            # ---------------- TUNING ---------------- #
+            # Successive halving on row subsamples; the search budget is
+            # split evenly over the models still to be tuned
+            if tune:
+                tuning = []
+                deadline = time.perf_counter() + search_budget
+                to_tune = [name for name in zoo if name in PARAM_GRIDS]
+
+                for i, name in enumerate(to_tune):
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+
+                    best = successive_halving(
+                        zoo[name], PARAM_GRIDS[name], folds, scorer,
+                        max_workers=n_workers,
+                        deadline=time.perf_counter() + remaining / (len(to_tune) - i)
+                    )
+                    if best is None:
+                        # No round finished in time: keep the defaults
+                        tuning.append({
+                            "Model": name,
+                            "Best Params": "defaults (search timed out)",
+                            "Rounds": 0,
+                            "Rows (final round)": 0,
+                            f"Search {metric_name}": None
+                        })
+                        continue
+
+                    zoo[name] = zoo[name].set_params(**best["params"])
+
+                    tuning.append({
+                        "Model": name,
+                        "Best Params": str(best["params"]),
+                        "Rounds": len(best["rounds"]),
+                        "Rows (final round)": best["rows"],
+                        f"Search {metric_name}": round(best["score"], 4)
+                    })
+
+                st.subheader("🎛️ Tuning Results")
+                st.table(pd.DataFrame(tuning))
 
             results = []
             best_score = -np.inf
             best_model = None
 
+            st.subheader("📊 Benchmark Results")
+            results_table = st.empty()
+            started = time.perf_counter()
+
             # ---------------- BENCHMARKING ---------------- #
-            for name, model in models.items():
-                pipeline = Pipeline([
-                    ("scaler", StandardScaler()),
-                    ("model", model)
-                ])
-
-                pipeline.fit(X_train, y_train)
-                preds = pipeline.predict(X_test)
-                score = scorer(y_test, preds)
-
-                results.append({
-                    "Model": name,
-                    metric_name: round(score, 4)
-                })
-
-                if score > best_score:
+            # Models are fitted in parallel; rows appear as each one finishes
+            for result in run_zoo(
+                zoo, folds, scorer,
+                max_workers=n_workers, budget=budget
+            ):
+                score = result["score"]
+
+                row = {
+                    "Model": result["model"],
+                    metric_name: None if score is None else round(score, 4)
+                }
+                if len(folds) > 1:
+                    row["± Std"] = (
+                        None if result["std"] is None
+                        else round(result["std"], 4)
+                    )
+                row["Time (s)"] = round(result["seconds"], 2)
+                row["Status"] = result["status"]
+
+                results.append(row)
+                results_table.table(pd.DataFrame(results))
+
+                if score is not None and score > best_score:
                     best_score = score
-                    best_model = name
+                    best_model = result["model"]
+
+            wall_time = time.perf_counter() - started
 
         # ---------------- RESULTS ---------------- #
-        st.success("Benchmark completed")
+        st.success(
+            f"Benchmark completed in {wall_time:.2f}s on {len(folds)} fold(s)"
+        )
 
         st.subheader("🏆 Best Model")
         st.write(best_model)
 
-        st.subheader("📊 Benchmark Results")
-        st.table(pd.DataFrame(results))
-
         st.metric(
             label=metric_name,
             value=round(best_score, 4)
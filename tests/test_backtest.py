@@ -0,0 +1,76 @@
+"""The running-sum rolling fits in core.backtest against per-window fits."""
+
+import numpy as np
+import pytest
+
+from core.backtest import rolling_trend_signals
+from core.forecast import trend_forecast, trend_signals
+
+
+def brute_force(prices, window, horizon, recent_days):
+    """Signals from a separate trend_forecast / trend_signals per window.
+
+    Returns ``(signals, margins)``: the margin is how far the forecast
+    average is from the recent average (NaN where there is no signal).
+    """
+    n = len(prices)
+    signals = np.zeros(n)
+    margins = np.full(n, np.nan)
+
+    for end in range(window - 1, n):
+        segment = prices[end - window + 1:end + 1]
+        if np.isnan(segment).any():
+            continue
+        forecast, _ = trend_forecast(segment, horizon)
+        buy, _, recent_avg, future_avg = trend_signals(segment, forecast, recent_days)
+        signals[end] = 1.0 if buy[0] else -1.0
+        margins[end] = future_avg[0] - recent_avg[0]
+    return signals, margins
+
+
+def random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 + np.cumsum(rng.standard_normal(n))
+
+
+def assert_same_signals(prices, window, horizon, recent_days):
+    got = rolling_trend_signals(prices, window, horizon, recent_days)
+    expected, margins = brute_force(prices, window, horizon, recent_days)
+
+    # Calls decided by rounding noise may go either way
+    clear = ~(np.abs(margins) < 1e-9)
+    np.testing.assert_array_equal(got[clear], expected[clear])
+
+
+@pytest.mark.parametrize("window, horizon, recent_days", [
+    (2, 1, 10),       # recent period longer than the window
+    (5, 3, 3),
+    (20, 5, 10),
+    (60, 30, 10),
+])
+def test_matches_a_fit_per_window(window, horizon, recent_days):
+    assert_same_signals(random_walk(400), window, horizon, recent_days)
+
+
+def test_no_signal_during_warm_up():
+    signals = rolling_trend_signals(random_walk(50), 20, 5)
+    assert not signals[:19].any()
+    assert np.all(signals[19:] != 0)
+
+
+@pytest.mark.parametrize("n, window", [(10, 20), (20, 1)])
+def test_no_signal_without_a_usable_window(n, window):
+    assert not rolling_trend_signals(random_walk(n), window, 5).any()
+
+
+def test_gaps_only_silence_the_windows_that_contain_them():
+    prices = random_walk(300, seed=1)
+    prices[[50, 51, 200]] = np.nan
+    window = 20
+
+    signals = rolling_trend_signals(prices, window, 5)
+
+    assert not signals[50:51 + window].any()
+    assert not signals[200:200 + window].any()
+    assert signals[51 + window:200].all()
+    assert_same_signals(prices, window, 5, 10)
@@ -0,0 +1,210 @@
+"""Handle / stale / fallback behaviour of core.handles against a stub backend."""
+
+import io
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from core.handles import DatasetHandles
+
+OPERATION = "/ops/run"
+DATASET = b"a,b\n" + b"1,2\n" * 5_000
+
+
+class Backend:
+    """Configurable stub: which routes exist and which handles it holds.
+
+    It has no resumable ``/uploads`` API, so uploads go to ``/datasets``.
+    """
+
+    def __init__(self, datasets=True, operation=True):
+        self.datasets = datasets        # POST /datasets and GET /datasets/<id>
+        self.operation = operation      # OPERATION route
+        self.held = {}                  # dataset_id -> content hash
+        self.gone = set()               # handles answered with 410
+        self.calls = []                 # (method, path, body bytes)
+
+    def handle(self, method, path, headers, body):
+        self.calls.append((method, path, len(body)))
+
+        if path == "/datasets" and self.datasets:
+            form = {}
+            if headers.get("Content-Type", "").startswith("application/x-www-form-urlencoded"):
+                form = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+            if len(body) < len(DATASET):
+                # Probe by hash: known content, or "send the file"
+                for dataset_id, key in self.held.items():
+                    if key == form.get("content_hash"):
+                        return 200, {"dataset_id": dataset_id}
+                return 422, {"detail": "file required"}
+            dataset_id = f"ds{len(self.held)}"
+            self.held[dataset_id] = "uploaded"
+            return 200, {"dataset_id": dataset_id}
+
+        if path.startswith("/datasets/") and method == "GET" and self.datasets:
+            dataset_id = path.rsplit("/", 1)[-1]
+            return (200, {}) if dataset_id in self.held else (404, {})
+
+        if path == OPERATION and self.operation:
+            if b"dataset_id=" in body:
+                dataset_id = parse_qs(body.decode())["dataset_id"][0]
+                if dataset_id in self.gone:
+                    return 410, {}
+                if dataset_id not in self.held:
+                    return 404, {"detail": "unknown dataset"}
+                return 200, {"by": "handle"}
+            return 200, {"by": "file"}
+
+        return 404, {"detail": "Not Found"}
+
+    def count(self, method, path, large=None):
+        return sum(
+            1 for m, p, size in self.calls
+            if m == method and p == path
+            and (large is None or (size >= len(DATASET)) == large)
+        )
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(backend):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _body(self):
+                if self.headers.get("Transfer-Encoding") == "chunked":
+                    body = b""
+                    while True:
+                        size = int(self.rfile.readline().strip(), 16)
+                        if size == 0:
+                            self.rfile.readline()
+                            return body
+                        body += self.rfile.read(size)
+                        self.rfile.readline()
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            def _answer(self, method):
+                status, payload = backend.handle(
+                    method, self.path, self.headers, self._body()
+                )
+                out = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            def do_GET(self):
+                self._answer("GET")
+
+            def do_POST(self):
+                self._answer("POST")
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def dataset(name="data.csv"):
+    file = io.BytesIO(DATASET)
+    file.name = name
+    return file
+
+
+def test_backend_without_handles_never_gets_the_file_twice(serve):
+    backend = Backend(datasets=False)
+    base_url = serve(backend)
+    handles = DatasetHandles()
+
+    for key in ("k1", "k1", "k2"):
+        response = handles.post(base_url, OPERATION, dataset(), key)
+        assert response.json() == {"by": "file"}
+
+    # One small probe, then the capability is remembered
+    assert backend.count("POST", "/datasets") == 1
+    assert backend.count("POST", "/datasets", large=True) == 0
+    assert backend.count("POST", "/uploads") == 0
+    assert not handles.supported(base_url)
+
+
+def test_upload_once_then_send_by_handle(serve):
+    backend = Backend()
+    base_url = serve(backend)
+    handles = DatasetHandles()
+
+    for _ in range(3):
+        response = handles.post(base_url, OPERATION, dataset(), "k1")
+        assert response.json() == {"by": "handle"}
+
+    assert backend.count("POST", "/datasets", large=True) == 1
+    assert backend.count("POST", OPERATION) == 3
+
+    # A second dataset doesn't ask for /uploads again
+    handles.post(base_url, OPERATION, dataset(), "k2")
+    assert backend.count("POST", "/uploads") == 1
+
+
+def test_probe_reuses_content_the_backend_already_holds(serve):
+    backend = Backend()
+    backend.held["ds9"] = "k1"
+    base_url = serve(backend)
+
+    response = DatasetHandles().post(base_url, OPERATION, dataset(), "k1")
+
+    assert response.json() == {"by": "handle"}
+    assert backend.count("POST", "/datasets", large=True) == 0
+
+
+def test_confirmed_stale_handle_is_uploaded_again(serve):
+    backend = Backend()
+    base_url = serve(backend)
+    handles = DatasetHandles()
+    handles.post(base_url, OPERATION, dataset(), "k1")
+
+    backend.held.clear()      # the backend forgot every handle
+    response = handles.post(base_url, OPERATION, dataset(), "k1")
+
+    assert response.json() == {"by": "handle"}
+    assert backend.count("GET", "/datasets/ds0") == 1
+    assert backend.count("POST", "/datasets", large=True) == 2
+
+
+def test_gone_handle_is_uploaded_again_without_checking(serve):
+    backend = Backend()
+    base_url = serve(backend)
+    handles = DatasetHandles()
+    handles.post(base_url, OPERATION, dataset(), "k1")
+
+    backend.gone.add("ds0")
+    response = handles.post(base_url, OPERATION, dataset(), "k1")
+
+    assert response.json() == {"by": "handle"}
+    assert backend.count("GET", "/datasets/ds0") == 0
+    assert backend.count("POST", "/datasets", large=True) == 2
+
+
+def test_missing_operation_is_not_mistaken_for_a_stale_handle(serve):
+    backend = Backend(operation=False)
+    base_url = serve(backend)
+    handles = DatasetHandles()
+
+    response = handles.post(base_url, OPERATION, dataset(), "k1")
+
+    # The handle checks out, so the 404 is returned after one plain upload
+    assert response.status_code == 404
+    assert backend.count("GET", "/datasets/ds0") == 1
+    assert backend.count("POST", "/datasets", large=True) == 1
+    assert backend.count("POST", OPERATION, large=True) == 1
@@ -0,0 +1,166 @@
+"""Response cache hits, eviction and single-flight in core.http."""
+
+import threading
+import time
+
+import pytest
+import requests
+
+from core.http import ResponseCache
+
+
+def response(body=b"ok", status=200):
+    r = requests.Response()
+    r.status_code = status
+    r._content = body
+    return r
+
+
+class Backend:
+    """``send`` callable counting calls; optionally blocks until released."""
+
+    def __init__(self, body=b"ok", status=200, error=None, block=False):
+        self.body = body
+        self.status = status
+        self.error = error
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        return response(self.body, self.status)
+
+
+def followers(cache, key, send, n=3):
+    """Start ``n`` threads fetching ``key``; returns (threads, results)."""
+    results = []
+
+    def fetch():
+        try:
+            results.append(cache.fetch(key, send).content)
+        except Exception as e:
+            results.append(e)
+
+    threads = [threading.Thread(target=fetch) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_repeated_request_is_served_from_cache():
+    cache = ResponseCache()
+    send = Backend()
+
+    first = cache.fetch("k", send)
+    second = cache.fetch("k", send)
+
+    assert send.calls == 1
+    assert first.content == second.content == b"ok"
+    assert first is not second      # callers get their own copy
+
+
+def test_error_responses_are_not_cached():
+    cache = ResponseCache()
+    send = Backend(status=500)
+
+    cache.fetch("k", send)
+    cache.fetch("k", send)
+
+    assert send.calls == 2
+
+
+def test_entries_expire_after_ttl():
+    cache = ResponseCache(ttl=0.05)
+    send = Backend()
+
+    cache.fetch("k", send)
+    time.sleep(0.1)
+    cache.fetch("k", send)
+
+    assert send.calls == 2
+
+
+def test_least_recently_used_entries_are_evicted_past_the_byte_bound():
+    cache = ResponseCache(max_bytes=10)
+    a, b, c = Backend(b"aaaa"), Backend(b"bbbb"), Backend(b"cccc")
+
+    cache.fetch("a", a)
+    cache.fetch("b", b)
+    cache.fetch("a", a)          # a is now the most recent
+    cache.fetch("c", c)          # 12 bytes: b goes
+
+    cache.fetch("a", a)
+    cache.fetch("b", b)
+    assert (a.calls, b.calls) == (1, 2)
+
+
+def test_oversized_bodies_are_never_stored():
+    cache = ResponseCache(max_bytes=3)
+    send = Backend(b"toolong")
+
+    cache.fetch("k", send)
+    cache.fetch("k", send)
+
+    assert send.calls == 2
+
+
+def test_concurrent_identical_requests_share_one_call():
+    cache = ResponseCache()
+    send = Backend(block=True)
+
+    threads, results = followers(cache, "k", send, n=4)
+    send.started.wait(5)
+    time.sleep(0.05)             # let the others queue behind the leader
+    send.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert send.calls == 1
+    assert results == [b"ok"] * 4
+
+
+def test_leader_error_is_raised_to_every_follower():
+    cache = ResponseCache()
+    send = Backend(error=requests.exceptions.ConnectionError("down"), block=True)
+
+    threads, results = followers(cache, "k", send, n=3)
+    send.started.wait(5)
+    time.sleep(0.05)
+    send.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert send.calls == 1
+    assert all(isinstance(r, requests.exceptions.ConnectionError) for r in results)
+
+
+class Interrupted(BaseException):
+    """Stands in for Streamlit's StopException / RerunException."""
+
+
+def test_interrupted_leader_lets_followers_ask_again():
+    cache = ResponseCache()
+    send = Backend(error=Interrupted(), block=True)
+
+    leader = threading.Thread(target=lambda: pytest.raises(
+        Interrupted, cache.fetch, "k", send
+    ))
+    leader.start()
+    send.started.wait(5)
+    threads, results = followers(cache, "k", send, n=3)
+    time.sleep(0.05)
+    send.release.set()
+    for thread in [leader, *threads]:
+        thread.join(5)
+
+    # One follower retries for the rest; nobody sees an IndexError
+    assert results == [b"ok"] * 3
+    assert send.calls == 2
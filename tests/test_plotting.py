@@ -0,0 +1,82 @@
+"""Downsampling in core.plotting: LTTB and min/max bucketing."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.plotting import downsample, lttb, minmax
+
+
+def noisy(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.standard_normal(n))
+
+
+# ---------------- LTTB ---------------- #
+@pytest.mark.parametrize("n, n_out", [(10, 3), (1000, 100), (10_001, 1500), (50, 49)])
+def test_lttb_keeps_endpoints_within_the_threshold(n, n_out):
+    y = noisy(n)
+    keep = lttb(np.arange(n), y, n_out)
+
+    assert len(keep) <= n_out
+    assert keep[0] == 0 and keep[-1] == n - 1
+    assert np.all(np.diff(keep) > 0)
+
+
+@pytest.mark.parametrize("n_out", [100, 100_000])
+def test_lttb_returns_short_series_whole(n_out):
+    n = 100
+    np.testing.assert_array_equal(lttb(np.arange(n), noisy(n), n_out), np.arange(n))
+
+
+def test_lttb_keeps_an_isolated_spike():
+    y = np.zeros(1000)
+    y[437] = 10
+    assert 437 in lttb(np.arange(1000), y, 50)
+
+
+def test_lttb_uses_the_x_spacing():
+    # Uneven x: the point far from its neighbours forms the largest triangle
+    x = np.concatenate([np.arange(500), [10_000], np.arange(10_001, 10_499)])
+    y = np.zeros(len(x))
+    y[500] = 1
+    assert 500 in lttb(x, y, 20)
+
+
+# ---------------- MIN/MAX ---------------- #
+@pytest.mark.parametrize("n, n_out", [(10, 4), (1000, 100), (1003, 100), (10_001, 1501)])
+def test_minmax_keeps_endpoints_within_the_threshold(n, n_out):
+    keep = minmax(noisy(n), n_out)
+
+    assert len(keep) <= n_out
+    assert keep[0] == 0 and keep[-1] == n - 1
+    assert np.all(np.diff(keep) > 0)
+
+
+@pytest.mark.parametrize("n_out", [100, 100_000])
+def test_minmax_returns_short_series_whole(n_out):
+    np.testing.assert_array_equal(minmax(noisy(100), n_out), np.arange(100))
+
+
+@pytest.mark.parametrize("spike", [1, 500, 1001])
+def test_minmax_keeps_every_bucket_extreme(spike):
+    y = noisy(1003, seed=3)
+    y[spike] = 1e3
+    y[spike + 1] = -1e3
+    keep = minmax(y, 100)
+
+    assert {spike, spike + 1} <= set(keep)
+    assert y[keep].max() == y.max() and y[keep].min() == y.min()
+
+
+# ---------------- SERIES ---------------- #
+def test_downsample_keeps_datetime_index_and_drops_gaps():
+    index = pd.date_range("2000-01-01", periods=5000, freq="D")
+    series = pd.Series(noisy(5000), index=index)
+    series.iloc[100] = np.nan
+
+    out = downsample(series, n_out=500)
+
+    assert len(out) <= 500
+    assert out.index[0] == index[0] and out.index[-1] == index[-1]
+    assert not out.isna().any()
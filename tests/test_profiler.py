@@ -0,0 +1,71 @@
+"""HyperLogLog cardinality estimates in core.profiler."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.profiler import HLL_PRECISION, hll_cardinality, profile
+
+
+def standard_error(p):
+    return 1.04 / np.sqrt(1 << p)
+
+
+def distinct(n, repeats=1, offset=0):
+    """``n`` distinct integers, each repeated ``repeats`` times, shuffled."""
+    values = np.repeat(np.arange(offset, offset + n), repeats)
+    return pd.Series(np.random.default_rng(n).permutation(values))
+
+
+@pytest.mark.parametrize("n", [100_000, 1_000_000])
+def test_estimate_is_within_the_error_bound(n):
+    estimate = hll_cardinality(distinct(n))
+    # Four standard errors: the hashes are fixed, so this never flakes
+    assert abs(estimate - n) / n < 4 * standard_error(HLL_PRECISION)
+
+
+@pytest.mark.parametrize("p", [8, 10, 12])
+def test_error_bound_follows_the_precision(p):
+    n = 200_000
+    assert abs(hll_cardinality(distinct(n), p=p) - n) / n < 4 * standard_error(p)
+
+
+def test_duplicates_and_nulls_are_not_counted():
+    values = pd.concat([
+        distinct(50_000, repeats=4).astype("float64"),
+        pd.Series([np.nan] * 20_000)
+    ])
+    estimate = hll_cardinality(values)
+    assert abs(estimate - 50_000) / 50_000 < 4 * standard_error(HLL_PRECISION)
+
+
+@pytest.mark.parametrize("n", [1, 10, 1_000, 20_000])
+def test_small_range_correction_is_near_exact(n):
+    # Up to 2.5 * m distinct values, linear counting on empty registers
+    # is used instead of the raw estimate, which is badly biased there
+    assert n <= 2.5 * (1 << HLL_PRECISION)
+    estimate = hll_cardinality(distinct(n, repeats=3))
+    assert abs(estimate - n) <= max(1, 0.01 * n)
+
+
+def test_strings_are_counted_like_any_other_value():
+    values = pd.Series([f"user-{i % 30_000}" for i in range(120_000)])
+    estimate = hll_cardinality(values)
+    assert abs(estimate - 30_000) / 30_000 < 4 * standard_error(HLL_PRECISION)
+
+
+def test_empty_and_all_null_columns_count_zero():
+    assert hll_cardinality(pd.Series([], dtype="float64")) == 0
+    assert hll_cardinality(pd.Series([np.nan] * 10)) == 0
+
+
+def test_profile_switches_to_estimates_above_the_threshold():
+    df = pd.DataFrame({"id": np.arange(5_000), "flag": np.arange(5_000) % 2})
+
+    exact = profile(df, approx_threshold=10_000)
+    approx = profile(df, approx_threshold=1_000)
+
+    assert not exact["approx"].any() and approx["approx"].all()
+    assert exact.at["id", "n_unique"] == 5_000
+    assert abs(approx.at["id", "n_unique"] - 5_000) <= 50
+    assert approx.at["flag", "n_unique"] == 2
@@ -0,0 +1,218 @@
+"""Retries, hedging and the circuit breaker in core.resilience / core.http."""
+
+import threading
+import time
+
+import pytest
+import requests
+
+from core import http, resilience
+from core.resilience import CircuitBreaker, PROBE, hedged, with_retries
+
+
+def response(status=200, headers=None):
+    r = requests.Response()
+    r.status_code = status
+    r.headers.update(headers or {})
+    r._content = b""
+    return r
+
+
+class Script:
+    """``send`` callable returning (or raising) the scripted outcomes in turn."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def __call__(self):
+        outcome = self.outcomes[min(self.calls, len(self.outcomes) - 1)]
+        self.calls += 1
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+# ---------------- RETRIES ---------------- #
+def test_connection_errors_are_retried():
+    send = Script(requests.exceptions.ConnectionError(), response(200))
+    assert with_retries(send, sleep=lambda _: None).status_code == 200
+    assert send.calls == 2
+
+
+def test_connect_timeouts_are_retried():
+    send = Script(requests.exceptions.ConnectTimeout(), response(200))
+    assert with_retries(send, sleep=lambda _: None).status_code == 200
+    assert send.calls == 2
+
+
+def test_read_timeouts_are_not_retried():
+    send = Script(requests.exceptions.ReadTimeout(), response(200))
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        with_retries(send, sleep=lambda _: None)
+    assert send.calls == 1
+
+
+@pytest.mark.parametrize("status, calls", [(503, 3), (504, 1), (500, 1)])
+def test_only_refusals_are_retried(status, calls):
+    send = Script(response(status))
+    assert with_retries(send, sleep=lambda _: None).status_code == status
+    assert send.calls == calls
+
+
+def test_retry_after_is_honoured():
+    clock = Clock()
+    send = Script(response(429, {"Retry-After": "2"}), response(200))
+    with_retries(send, sleep=clock.sleep, clock=clock)
+    assert clock.now == 2
+
+
+def test_no_attempt_starts_past_the_deadline():
+    clock = Clock()
+    send = Script(response(503, {"Retry-After": "5"}))
+    result = with_retries(
+        send, attempts=10, deadline=12, sleep=clock.sleep, clock=clock
+    )
+    assert result.status_code == 503
+    assert send.calls == 3          # at 0 s, 5 s and 10 s; 15 s is too late
+
+
+# ---------------- HEDGING ---------------- #
+def test_slow_call_is_hedged_and_the_first_answer_wins():
+    calls = []
+
+    def send():
+        calls.append(None)
+        if len(calls) == 1:
+            time.sleep(1)
+            return "slow"
+        return "fast"
+
+    started = time.monotonic()
+    assert hedged(send, 0.05) == "fast"
+    assert time.monotonic() - started < 0.5
+    assert len(calls) == 2
+
+
+def test_fast_call_is_not_hedged():
+    send = Script("ok")
+    assert hedged(send, 1) == "ok"
+    assert send.calls == 1
+
+
+def test_failed_hedge_falls_back_to_the_other_attempt():
+    calls = []
+
+    def send():
+        calls.append(None)
+        if len(calls) == 1:
+            time.sleep(0.2)
+            return "first"
+        raise requests.exceptions.ConnectionError()
+
+    assert hedged(send, 0.05) == "first"
+
+
+def test_only_cheap_calls_are_hedged():
+    assert http.hedgeable("POST", "/text/sentiment")
+    assert http.hedgeable("GET", "/uploads/u1")
+    assert not http.hedgeable("POST", "/inferno/classify")
+    assert not http.hedgeable("POST", "/modelcraft/benchmark")
+
+
+# ---------------- CIRCUIT BREAKER ---------------- #
+def open_breaker(monkeypatch, clock):
+    monkeypatch.setattr(resilience.time, "monotonic", clock)
+    breaker = CircuitBreaker(threshold=2, open_seconds=30)
+    breaker.record(False)
+    breaker.record(False)
+    return breaker
+
+
+def test_breaker_opens_after_consecutive_failures(monkeypatch):
+    breaker = open_breaker(monkeypatch, Clock())
+    assert breaker.open
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(threshold=2)
+    breaker.record(False)
+    breaker.record(True)
+    breaker.record(False)
+    assert not breaker.open
+
+
+def test_unrelated_errors_do_not_count():
+    breaker = CircuitBreaker(threshold=1)
+    breaker.record(None)
+    assert not breaker.open
+
+
+def test_half_open_lets_a_single_probe_through(monkeypatch):
+    clock = Clock()
+    breaker = open_breaker(monkeypatch, clock)
+    clock.now = 31
+
+    assert breaker.allow() == PROBE
+    assert not breaker.allow()
+
+    breaker.record(True, probe=True)
+    assert not breaker.open
+    assert breaker.allow() is True
+
+
+def test_only_the_probe_settles_the_half_open_state(monkeypatch):
+    clock = Clock()
+    breaker = open_breaker(monkeypatch, clock)
+    clock.now = 31
+    assert breaker.allow() == PROBE
+
+    # A call admitted before the circuit opened finishes meanwhile
+    breaker.record(None)
+    assert not breaker.allow()
+
+    # The probe fails: open again for another full period
+    breaker.record(False, probe=True)
+    assert not breaker.allow()
+    clock.now = 62
+    assert breaker.allow() == PROBE
+
+
+def test_probe_without_a_verdict_frees_the_slot(monkeypatch):
+    clock = Clock()
+    breaker = open_breaker(monkeypatch, clock)
+    clock.now = 31
+    assert breaker.allow() == PROBE
+
+    breaker.record(None, probe=True)
+    assert breaker.allow() == PROBE
+
+
+def test_probes_race_for_a_single_slot(monkeypatch):
+    clock = Clock()
+    breaker = open_breaker(monkeypatch, clock)
+    clock.now = 31
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(breaker.allow()))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(PROBE) == 1